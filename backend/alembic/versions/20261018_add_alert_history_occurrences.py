@@ -0,0 +1,26 @@
+"""Add occurrence_count to alert_history for collapsed duplicate alerts
+
+Revision ID: 20261018_alert_occurrences
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_alert_occurrences'
+down_revision = '20251231_demo_requests'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'alert_history',
+        sa.Column('occurrence_count', sa.Integer, nullable=True, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('alert_history', 'occurrence_count')
@@ -0,0 +1,27 @@
+"""Add (user_id, is_active, created_at DESC) index for alert rule listing
+
+Revision ID: 20261018_alert_rules_listing
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_alert_rules_listing'
+down_revision = '20261018_alert_occurrences'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_alert_rules_user_active_created',
+        'alert_rules',
+        ['user_id', 'is_active', sa.text('created_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_alert_rules_user_active_created', table_name='alert_rules')
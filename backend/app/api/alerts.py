@@ -87,6 +87,7 @@ class AlertHistoryResponse(BaseModel):
     email_sent_at: Optional[str] = None
     email_recipients: Optional[List[str]] = None
     email_error: Optional[str] = None
+    occurrence_count: int = 1
     triggered_at: Optional[str] = None
 
 
@@ -113,7 +114,9 @@ async def create_alert_rule(
     - **pipeline_id**: Optional pipeline to monitor
     - **name**: Alert name
     - **rule_type**: Type of anomaly to detect (volume_spike, volume_drop, gap_detection, null_ratio)
-    - **threshold_config**: Detection thresholds specific to the rule type
+    - **threshold_config**: Detection thresholds specific to the rule type, plus optional
+      `sampling` ("first"/"last"/"disabled") and `cache_minutes` to collapse repeated anomalies
+      (volume rules accept `z_threshold` to alert on deviation from a rolling baseline instead)
     - **enabled_days**: Days to send alerts (0=Monday, 4=Friday, 6=Sunday)
     - **severity**: Alert severity level
     - **recipients**: Email addresses to notify
@@ -147,6 +150,8 @@ async def create_alert_rule(
 async def list_alert_rules(
     pipeline_id: Optional[str] = Query(None, description="Filter by pipeline ID"),
     active_only: bool = Query(False, description="Only return active rules"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Max results to return"),
+    offset: int = Query(0, ge=0, description="Results to skip"),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -155,6 +160,7 @@ async def list_alert_rules(
     Optional filters:
     - **pipeline_id**: Filter by specific pipeline
     - **active_only**: Only return active rules
+    - **limit** / **offset**: Paginate results (default: all rules)
     """
     from app.services.alert_service import alert_service
 
@@ -162,7 +168,9 @@ async def list_alert_rules(
         rules = alert_service.list_rules(
             user_id=user_id,
             pipeline_id=pipeline_id,
-            active_only=active_only
+            active_only=active_only,
+            limit=limit,
+            offset=offset
         )
         return [AlertRuleResponse(**r) for r in rules]
 
@@ -265,6 +273,7 @@ async def test_alert_rule(
 async def get_alert_history(
     rule_id: Optional[str] = Query(None, description="Filter by rule ID"),
     limit: int = Query(50, ge=1, le=200, description="Max results to return"),
+    offset: int = Query(0, ge=0, description="Results to skip"),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -272,6 +281,7 @@ async def get_alert_history(
 
     - **rule_id**: Optional filter by specific rule
     - **limit**: Maximum number of results (default 50, max 200)
+    - **offset**: Results to skip, for paging through older alerts
     """
     from app.services.alert_service import alert_service
 
@@ -279,7 +289,8 @@ async def get_alert_history(
         history = alert_service.get_history(
             user_id=user_id,
             rule_id=rule_id,
-            limit=limit
+            limit=limit,
+            offset=offset
         )
         return [AlertHistoryResponse(**h) for h in history]
 
@@ -4,9 +4,11 @@ Endpoints for schema discovery and CDC readiness checks.
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
+# Schema listings and readiness reports can be large; they are serialized with orjson
 router = APIRouter()
 
 
@@ -84,7 +86,7 @@ class CDCReadinessResponse(BaseModel):
 from app.utils.auth_dependencies import get_current_user_id
 
 
-@router.post("/discover", response_model=SchemaDiscoveryResponse)
+@router.post("/discover", response_model=SchemaDiscoveryResponse, response_class=ORJSONResponse)
 async def discover_schema(
     request: SchemaDiscoveryRequest,
     user_id: str = Depends(get_current_user_id)
@@ -126,7 +128,7 @@ async def discover_schema(
         raise HTTPException(status_code=500, detail=f"Schema discovery failed: {str(e)}")
 
 
-@router.post("/check-readiness", response_model=CDCReadinessResponse)
+@router.post("/check-readiness", response_model=CDCReadinessResponse, response_class=ORJSONResponse)
 async def check_cdc_readiness(
     request: CDCReadinessRequest,
     user_id: str = Depends(get_current_user_id)
@@ -172,7 +174,7 @@ async def check_cdc_readiness(
         raise HTTPException(status_code=500, detail=f"CDC readiness check failed: {str(e)}")
 
 
-@router.get("/schemas/{credential_id}", response_model=List[Dict[str, Any]])
+@router.get("/schemas/{credential_id}", response_model=List[Dict[str, Any]], response_class=ORJSONResponse)
 async def get_discovered_schemas(
     credential_id: str,
     user_id: str = Depends(get_current_user_id)
@@ -64,6 +64,9 @@ class Settings(BaseSettings):
     # ksqlDB
     ksqldb_url: str = "http://localhost:8088"
 
+    # Redis (Socket.IO message queue for multi-worker deployments)
+    redis_url: str = ""
+
     # SMTP (Mailhog for development)
     smtp_host: str = "mailhog"
     smtp_port: int = 1025
@@ -91,6 +94,10 @@ class Settings(BaseSettings):
     def has_kafka_connect_url(self) -> bool:
         return bool(self.kafka_connect_url and self.kafka_connect_url.strip())
 
+    @property
+    def has_redis_url(self) -> bool:
+        return bool(self.redis_url and self.redis_url.strip())
+
     @property
     def has_confluent_cloud_api(self) -> bool:
         return bool(
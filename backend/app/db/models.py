@@ -452,6 +452,7 @@ class AlertRule(Base):
 
     __table_args__ = (
         Index('idx_alert_rules_user_pipeline', 'user_id', 'pipeline_id'),
+        Index('idx_alert_rules_user_active_created', 'user_id', 'is_active', created_at.desc()),
     )
 
     def to_dict(self):
@@ -520,6 +521,7 @@ class AlertHistory(Base):
     email_sent_at = Column(DateTime, nullable=True)
     email_recipients = Column(JSON, nullable=True)
     email_error = Column(Text, nullable=True)
+    occurrence_count = Column(Integer, default=1, server_default='1')  # Duplicates collapsed into this alert
     triggered_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
@@ -542,5 +544,6 @@ class AlertHistory(Base):
             "email_sent_at": to_iso_utc(self.email_sent_at),
             "email_recipients": self.email_recipients,
             "email_error": self.email_error,
+            "occurrence_count": self.occurrence_count,
             "triggered_at": to_iso_utc(self.triggered_at),
         }
@@ -3,48 +3,164 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 import socketio
+import re
+import json
+import asyncio
+import time
+import logging
+from typing import Dict, Tuple, Optional
 from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.api.routes import router
+from app.modules.executor import module_executor
 from app.services.gemini_service import GeminiService
 from app.services.metrics_processor import metrics_processor
 from app.services.monitoring_service import monitoring_service
 from app.utils.jwt_utils import verify_access_token
+from app.utils import json_utils
+from app.utils.logging_config import configure_logging, shutdown_logging
 
-# Socket.IO server
+configure_logging(logging.DEBUG if settings.is_development else logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Single source of truth for browser origins (HTTP CORS + Socket.IO)
+ALLOWED_ORIGINS = frozenset({'http://localhost:3000', 'http://127.0.0.1:3000'})
+
+# Share rooms/emits across uvicorn workers through Redis when configured
+client_manager = socketio.AsyncRedisManager(settings.redis_url) if settings.has_redis_url else None
+
+# Socket.IO server (packets encoded with orjson via json_utils)
 sio = socketio.AsyncServer(
     async_mode='asgi',
-    cors_allowed_origins=['http://localhost:3000', 'http://127.0.0.1:3000']
+    cors_allowed_origins=sorted(ALLOWED_ORIGINS),
+    client_manager=client_manager,
+    json=json_utils
 )
 
 
+# Bound once in lifespan so chat_message avoids per-message lookups/imports
+_gemini: Optional[GeminiService] = None
+_confirmation_handlers = None
+
+# Upper bound for starting/stopping background services in lifespan
+LIFESPAN_STEP_TIMEOUT_SECONDS = 10.0
+
+# Greeting sent on every successful connect; shared, never mutated
+CONNECT_GREETING = {
+    'message': 'Connected to DataFlow AI! How can I help you today?',
+    'actions': ()
+}
+
+
+# Trivial messages answered locally without a Gemini round-trip
+QUICK_INTENT_PATTERN = re.compile(r'^\s*(hi|hello|hey|help|ping)[\s!.?]*$', re.IGNORECASE)
+QUICK_GREETING = "Hi! I can help you build real-time data pipelines. What would you like to do?"
+QUICK_RESPONSES = {
+    'hi': QUICK_GREETING,
+    'hello': QUICK_GREETING,
+    'hey': QUICK_GREETING,
+    'help': (
+        "Here's what I can help with:\n\n"
+        "- **Connect a source** - PostgreSQL or MySQL with CDC\n"
+        "- **Build a pipeline** - select tables, filter rows, stream to ClickHouse\n"
+        "- **Enrich data** - join streams with lookup tables\n"
+        "- **Set up alerts** - get notified about anomalies\n\n"
+        "Just describe what you want, e.g. \"Stream my orders table from PostgreSQL to ClickHouse\"."
+    ),
+    'ping': 'pong',
+}
+
+
+async def emit_response(sid, message: str, actions=()):
+    """Emit a chat_response event to a single client"""
+    await sio.emit('chat_response', {
+        'message': message,
+        'actions': list(actions)
+    }, room=sid)
+
+
+# Identical chat_message failures only log a full traceback once per window
+ERROR_TRACEBACK_WINDOW_SECONDS = 60.0
+_recent_errors: Dict[Tuple[str, str], float] = {}
+
+
+def _log_chat_error(e: Exception):
+    """Log a chat_message failure; must be called from an except block"""
+    key = (type(e).__name__, str(e))
+    now = time.monotonic()
+    last_logged = _recent_errors.get(key)
+
+    if last_logged is not None and now - last_logged < ERROR_TRACEBACK_WINDOW_SECONDS:
+        logger.error("chat_message failed (repeated): %s: %s", key[0], e)
+        return
+
+    if len(_recent_errors) >= 256:
+        _recent_errors.clear()
+    _recent_errors[key] = now
+    logger.exception("chat_message failed")
+
+
+# Confirmation action_type -> ConfirmationHandlers coroutine method name
+CONFIRMATION_DISPATCH = {
+    'confirm_source_select': 'handle_source_selection',
+    'confirm_credentials': 'handle_credential_confirmation',
+    'confirm_tables': 'handle_table_confirmation',
+    'confirm_filter': 'handle_filter_confirmation',
+    'confirm_schema': 'handle_schema_confirmation',
+    'confirm_topic': 'handle_topic_confirmation',
+    'confirm_cost': 'handle_cost_confirmation',
+    'confirm_resources': 'handle_resources_confirmation',
+    'confirm_destination': 'handle_destination_confirmation',
+    'confirm_clickhouse_config': 'handle_clickhouse_config',
+    'confirm_schema_preview': 'handle_schema_preview',
+    'confirm_topic_registry': 'handle_topic_registry_confirmation',
+    'confirm_pipeline_create': 'handle_pipeline_confirmation',
+    'confirm_alert_config': 'handle_alert_confirmation',
+    'confirm_action': 'handle_generic_confirmation'
+}
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print(f"Starting DataFlow AI API in {settings.environment} mode...")
-    print(f"  - Gemini: {'REAL' if settings.has_gemini_api_key else 'MOCK'}")
-    print(f"  - Kafka: {'REAL' if settings.has_kafka_credentials else 'MOCK'}")
-    print(f"  - OAuth: {'REAL' if settings.has_google_oauth_credentials else 'MOCK'}")
-    print(f"  - Google Ads Data: {'REAL' if settings.has_google_ads_developer_token else 'MOCK (no developer token)'}")
+    logger.info("Starting DataFlow AI API in %s mode...", settings.environment)
+    logger.info("  - Gemini: %s", 'REAL' if settings.has_gemini_api_key else 'MOCK')
+    logger.info("  - Kafka: %s", 'REAL' if settings.has_kafka_credentials else 'MOCK')
+    logger.info("  - OAuth: %s", 'REAL' if settings.has_google_oauth_credentials else 'MOCK')
+    logger.info("  - Google Ads Data: %s", 'REAL' if settings.has_google_ads_developer_token else 'MOCK (no developer token)')
 
-    app.state.gemini = GeminiService()
+    global _gemini, _confirmation_handlers
+    from app.services.confirmation_handlers import confirmation_handlers
 
-    # Start metrics processor if Kafka is configured
-    if settings.has_kafka_credentials:
-        metrics_processor.start()
-        print("  - Metrics Processor: STARTED")
+    app.state.gemini = _gemini = GeminiService()
+    _confirmation_handlers = confirmation_handlers
 
-    # Start background monitoring service
-    await monitoring_service.start()
-    print("  - Monitoring Service: STARTED")
+    # Start background monitoring, plus the metrics processor if Kafka is configured
+    startup_tasks = [monitoring_service.start()]
+    if settings.has_kafka_credentials:
+        startup_tasks.append(asyncio.to_thread(metrics_processor.start))
+    await asyncio.wait_for(asyncio.gather(*startup_tasks), LIFESPAN_STEP_TIMEOUT_SECONDS)
+    logger.info("  - Monitoring Service: STARTED")
+    if settings.has_kafka_credentials:
+        logger.info("  - Metrics Processor: STARTED")
 
     yield
 
-    # Shutdown
-    print("Shutting down DataFlow AI API...")
-    await monitoring_service.stop()
-    metrics_processor.stop()
+    # Shutdown (metrics_processor.stop() joins its thread, so keep it off the loop)
+    logger.info("Shutting down DataFlow AI API...")
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                monitoring_service.stop(),
+                asyncio.to_thread(metrics_processor.stop),
+                module_executor.close()
+            ),
+            LIFESPAN_STEP_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Background services did not stop within %ss", LIFESPAN_STEP_TIMEOUT_SECONDS)
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -76,7 +192,7 @@ app.add_middleware(SecurityHeadersMiddleware)
 # CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
+    allow_origins=sorted(ALLOWED_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -104,65 +220,57 @@ async def connect(sid, environ, auth):
         token = auth.get('token') if auth else None
 
         if not token:
-            print(f"Connection rejected for {sid}: No token provided")
+            logger.info("Connection rejected for %s: No token provided", sid)
             return False
 
         # Verify JWT token
         payload = verify_access_token(token)
         if not payload:
-            print(f"Connection rejected for {sid}: Invalid token")
+            logger.info("Connection rejected for %s: Invalid token", sid)
             return False
 
         # Extract user_id from token payload
         user_id = payload.get('sub')
         if not user_id:
-            print(f"Connection rejected for {sid}: No user_id in token")
+            logger.info("Connection rejected for %s: No user_id in token", sid)
             return False
 
         # Store user_id in Socket.IO session
         await sio.save_session(sid, {'user_id': user_id})
 
-        print(f"Client connected: {sid} (user: {user_id})")
-        await sio.emit('chat_response', {
-            'message': 'Connected to DataFlow AI! How can I help you today?',
-            'actions': []
-        }, room=sid)
+        logger.info("Client connected: %s (user: %s)", sid, user_id)
+        await sio.emit('chat_response', CONNECT_GREETING, room=sid)
 
         return True
 
     except Exception as e:
-        print(f"Connection error for {sid}: {str(e)}")
+        logger.warning("Connection error for %s: %s", sid, e)
         return False
 
 
 @sio.event
 async def chat_message(sid, data):
     """Handle incoming chat message with session-based authentication"""
-    import json
-    from app.services.confirmation_handlers import confirmation_handlers
-
     # Get user_id from Socket.IO session (set during connect)
     try:
         session = await sio.get_session(sid)
         user_id = session.get('user_id')
 
         if not user_id:
-            await sio.emit('chat_response', {
-                'message': 'Authentication error. Please reconnect.',
-                'actions': []
-            }, room=sid)
+            await emit_response(sid, 'Authentication error. Please reconnect.')
             await sio.disconnect(sid)
             return
 
     except Exception as e:
-        print(f"Session error for {sid}: {str(e)}")
-        await sio.emit('chat_response', {
-            'message': 'Session error. Please reconnect.',
-            'actions': []
-        }, room=sid)
+        logger.warning("Session error for %s: %s", sid, e)
+        await emit_response(sid, 'Session error. Please reconnect.')
         await sio.disconnect(sid)
         return
 
+    if not isinstance(data, dict):
+        await emit_response(sid, 'Invalid message payload.')
+        return
+
     user_message = data.get('message', '')
 
     # Check for reprocess confirmation (legacy)
@@ -171,81 +279,25 @@ async def chat_message(sid, data):
     # Check for new confirmation types
     confirmation = data.get('_confirmation')
 
-    print(f"Message from {user_id}: {user_message}")
+    logger.debug("Message from %s: %s", user_id, user_message)
 
     try:
         # Handle new confirmation types
         if confirmation:
             action_type = confirmation.get('action_type')
-            print(f"Processing confirmation: {action_type}")
+            logger.debug("Processing confirmation: %s", action_type)
 
-            if action_type == 'confirm_source_select':
-                response = await confirmation_handlers.handle_source_selection(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_credentials':
-                response = await confirmation_handlers.handle_credential_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_tables':
-                response = await confirmation_handlers.handle_table_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_filter':
-                response = await confirmation_handlers.handle_filter_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_schema':
-                response = await confirmation_handlers.handle_schema_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_topic':
-                response = await confirmation_handlers.handle_topic_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_cost':
-                response = await confirmation_handlers.handle_cost_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_resources':
-                response = await confirmation_handlers.handle_resources_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_destination':
-                response = await confirmation_handlers.handle_destination_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_clickhouse_config':
-                response = await confirmation_handlers.handle_clickhouse_config(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_schema_preview':
-                response = await confirmation_handlers.handle_schema_preview(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_topic_registry':
-                response = await confirmation_handlers.handle_topic_registry_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_pipeline_create':
-                response = await confirmation_handlers.handle_pipeline_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_alert_config':
-                response = await confirmation_handlers.handle_alert_confirmation(
-                    confirmation, user_id
-                )
-            elif action_type == 'confirm_action':
-                response = await confirmation_handlers.handle_generic_confirmation(
-                    confirmation, user_id
-                )
+            handler_name = CONFIRMATION_DISPATCH.get(action_type)
+            if handler_name:
+                handler = getattr(_confirmation_handlers, handler_name)
+                response = await handler(confirmation, user_id)
             else:
                 response = {
                     'message': f"Unknown confirmation type: {action_type}",
                     'actions': []
                 }
 
-            await sio.emit('chat_response', response, room=sid)
+            await emit_response(sid, response['message'], response.get('actions', []))
             return
 
         # Handle reprocess confirmation (legacy)
@@ -263,47 +315,60 @@ async def chat_message(sid, data):
 
                 # Parse result and send response
                 result_data = json.loads(result)
-                await sio.emit('chat_response', {
-                    'message': f"Reprocessing confirmed! {result_data.get('message', 'Pipeline updated.')}",
-                    'actions': []
-                }, room=sid)
+                await emit_response(
+                    sid,
+                    f"Reprocessing confirmed! {result_data.get('message', 'Pipeline updated.')}"
+                )
             else:
                 # User skipped reprocessing
-                await sio.emit('chat_response', {
-                    'message': "No problem! I'll use the existing processed data. You can generate a dashboard with the current data using the generate_dashboard command.",
-                    'actions': [{
+                await emit_response(
+                    sid,
+                    "No problem! I'll use the existing processed data. You can generate a dashboard with the current data using the generate_dashboard command.",
+                    [{
                         "type": "button",
                         "label": "Generate Dashboard"
                     }]
-                }, room=sid)
+                )
+            return
+
+        # Fast path for greetings/help
+        quick_match = QUICK_INTENT_PATTERN.match(user_message)
+        if quick_match:
+            await emit_response(sid, QUICK_RESPONSES[quick_match.group(1).lower()])
+            return
+
+        # Streaming clients receive chat_response_chunk deltas then chat_response_done
+        if data.get('stream'):
+            async for event in _gemini.stream_message(user_message, user_id):
+                if 'delta' in event:
+                    await sio.emit('chat_response_chunk', {'delta': event['delta']}, room=sid)
+                else:
+                    await sio.emit('chat_response_done', {
+                        'message': event['content'],
+                        'actions': event.get('actions', [])
+                    }, room=sid)
             return
 
         # Normal message processing with Gemini agent
-        gemini: GeminiService = app.state.gemini
-        response = await gemini.process_message(user_message, user_id)
+        response = await _gemini.process_message(user_message, user_id)
 
         # Send response back
-        await sio.emit('chat_response', {
-            'message': response['content'],
-            'actions': response.get('actions', [])
-        }, room=sid)
+        await emit_response(sid, response['content'], response.get('actions', []))
     except Exception as e:
-        print(f"Error processing message: {e}")
-        import traceback
-        traceback.print_exc()
-        await sio.emit('chat_response', {
-            'message': f"Sorry, I encountered an error: {str(e)}",
-            'actions': []
-        }, room=sid)
+        _log_chat_error(e)
+        await emit_response(sid, f"Sorry, I encountered an error: {str(e)}")
 
 
 @sio.event
 async def disconnect(sid):
-    print(f"Client disconnected: {sid}")
+    logger.info("Client disconnected: %s", sid)
 
 
-# Mount Socket.IO
-socket_app = socketio.ASGIApp(sio, app)
+# Mount Socket.IO in front of FastAPI: /socket.io/ goes to Socket.IO after a
+# single path-prefix check, everything else is forwarded to the FastAPI app.
+# (Mounting inside FastAPI would run polling requests through the HTTP
+# middlewares and duplicate the CORS headers Socket.IO already sets.)
+socket_app = socketio.ASGIApp(sio, other_asgi_app=app, socketio_path='socket.io')
 
 # For running directly
 if __name__ == "__main__":
@@ -312,5 +377,6 @@ if __name__ == "__main__":
         "app.main:socket_app",
         host=settings.api_host,
         port=settings.api_port,
+        backlog=4096,  # loop/http stay "auto": uvloop + httptools where available
         reload=settings.is_development
     )
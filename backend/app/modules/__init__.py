@@ -19,7 +19,7 @@ Usage:
     from app.modules import module_loader, module_executor
 
     # List available sources
-    sources = module_loader.list_sources()  # ['postgresql', 'mysql']
+    sources = module_loader.list_sources()  # dict_keys(['postgresql', 'mysql'])
 
     # Get source configuration
     pg_config = module_loader.get_source('postgresql')
@@ -17,16 +17,42 @@ Usage:
     await module_executor.create_destination_table("clickhouse", table_config)
 """
 
+import re
+import ssl
+import sys
+import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple, AsyncIterator, Union, Set
 from dataclasses import dataclass
 
 from app.modules.loader import module_loader, ModuleConfig
 
 logger = logging.getLogger(__name__)
 
+# Nullability as returned by the discovery queries (bool / 0-1), or the raw
+# information_schema 'YES' for custom queries that don't cast it
+NULLABLE_VALUES = frozenset({True, 'YES'})
 
-@dataclass
+# libpq sslmode values accepted by asyncpg
+PG_SSL_MODES = frozenset({'disable', 'allow', 'prefer', 'require', 'verify-ca', 'verify-full'})
+
+# Cached database pools idle longer than this are closed, and at most
+# MAX_CACHED_POOLS are kept (least recently used closed first)
+POOL_IDLE_TIMEOUT_SECONDS = 300.0
+MAX_CACHED_POOLS = 16
+
+# CDC checks written as SHOW statements, rewritten so they can be batched
+PG_SHOW_PATTERN = re.compile(r"^\s*SHOW\s+([A-Za-z_][A-Za-z0-9_.]*)\s*;?\s*$", re.IGNORECASE)
+MYSQL_SHOW_VARIABLE_PATTERN = re.compile(
+    r"^\s*SHOW\s+(?:GLOBAL\s+|SESSION\s+)?VARIABLES\s+LIKE\s+'([A-Za-z0-9_]+)'\s*;?\s*$",
+    re.IGNORECASE
+)
+
+
+@dataclass(slots=True)
 class SchemaColumn:
     """Column definition from schema discovery"""
     name: str
@@ -37,8 +63,20 @@ class SchemaColumn:
     ordinal_position: int = 0
     is_primary_key: bool = False
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON responses (cheaper than dataclasses.asdict)"""
+        return {
+            'name': self.name,
+            'data_type': self.data_type,
+            'is_nullable': self.is_nullable,
+            'table_schema': self.table_schema,
+            'table_name': self.table_name,
+            'ordinal_position': self.ordinal_position,
+            'is_primary_key': self.is_primary_key
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class TableSchema:
     """Complete table schema"""
     schema_name: str
@@ -47,8 +85,18 @@ class TableSchema:
     primary_keys: List[str]
     estimated_row_count: int = 0
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON responses (cheaper than dataclasses.asdict)"""
+        return {
+            'schema_name': self.schema_name,
+            'table_name': self.table_name,
+            'columns': [column.to_dict() for column in self.columns],
+            'primary_keys': self.primary_keys,
+            'estimated_row_count': self.estimated_row_count
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class CDCReadinessResult:
     """Result of CDC readiness check"""
     is_ready: bool
@@ -56,6 +104,15 @@ class CDCReadinessResult:
     missing_requirements: List[str]
     recommendations: List[str]
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON responses"""
+        return {
+            'is_ready': self.is_ready,
+            'checks': self.checks,
+            'missing_requirements': self.missing_requirements,
+            'recommendations': self.recommendations
+        }
+
 
 class ModuleExecutor:
     """
@@ -68,45 +125,283 @@ class ModuleExecutor:
     - Type mapping (for destinations)
     """
 
+    # Recommendation per failed CDC check name
+    _PG_RECOMMENDATIONS: Dict[str, str] = {
+        'WAL Level': "Set wal_level = 'logical' in postgresql.conf and restart PostgreSQL",
+        'Replication Permission': "Grant REPLICATION privilege: ALTER USER username REPLICATION;",
+    }
+    _MYSQL_RECOMMENDATIONS: Dict[str, str] = {
+        'Binary Log Enabled': "Enable binary logging: SET GLOBAL log_bin = ON; (requires restart)",
+        'Binary Log Format': "Set binlog format: SET GLOBAL binlog_format = 'ROW';",
+    }
+
     def __init__(self):
-        self._db_connections: Dict[str, Any] = {}
+        # Connection pools keyed by a hash of driver + connection params,
+        # ordered least recently used first
+        self._db_connections: OrderedDict[str, Any] = OrderedDict()
+        self._pool_last_used: Dict[str, float] = {}
+        self._pool_locks: Dict[str, asyncio.Lock] = {}
+        # Background close() of evicted pools (waits for in-use connections)
+        self._closing_pools: Set[asyncio.Task] = set()
+        # Keep-alive HTTP clients keyed by (scheme, host, port, username)
+        self._http_clients: Dict[Tuple[str, str, Any, str], Any] = {}
+        # SSL contexts keyed by (ssl_mode, root cert path), built once
+        self._ssl_contexts: Dict[Tuple[str, Optional[str]], Any] = {}
+
+    async def _get_pool(
+        self,
+        driver: str,
+        connection_params: Dict[str, Any],
+        create_pool: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Get the cached pool for these connection params, creating it once.
+
+        Every call marks the pool as used and evicts pools that have gone
+        idle or fall outside the MAX_CACHED_POOLS most recently used.
+        """
+        key = hashlib.blake2b(
+            f"{driver}:{sorted(connection_params.items())!r}".encode(),
+            digest_size=16
+        ).hexdigest()
+
+        pool = self._db_connections.get(key)
+        if pool is None:
+            # One lock per key so concurrent callers don't each create a pool
+            lock = self._pool_locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                pool = self._db_connections.get(key)
+                if pool is None:
+                    pool = await create_pool()
+                    self._db_connections[key] = pool
+                    logger.info(f"[MODULE_EXECUTOR] Created {driver} connection pool")
+
+        self._db_connections.move_to_end(key)
+        self._pool_last_used[key] = time.monotonic()
+        self._evict_pools()
+        return pool
+
+    def _evict_pools(self):
+        """Drop idle / least recently used pools and close them in the background"""
+        cutoff = time.monotonic() - POOL_IDLE_TIMEOUT_SECONDS
+        # Oldest first, so stop at the first pool that is recent and within the cap
+        for key in list(self._db_connections):
+            if len(self._db_connections) <= MAX_CACHED_POOLS and self._pool_last_used[key] > cutoff:
+                break
+            pool = self._db_connections.pop(key)
+            del self._pool_last_used[key]
+            self._pool_locks.pop(key, None)
+            logger.info("[MODULE_EXECUTOR] Evicting idle connection pool")
+
+            task = asyncio.create_task(self._close_pool(pool))
+            self._closing_pools.add(task)
+            task.add_done_callback(self._closing_pools.discard)
+
+    @staticmethod
+    async def _close_pool(pool: Any):
+        """Close an asyncpg or aiomysql pool, waiting for in-use connections"""
+        try:
+            if hasattr(pool, 'wait_closed'):
+                # aiomysql: close() is sync, wait_closed() awaits shutdown
+                pool.close()
+                await pool.wait_closed()
+            else:
+                await pool.close()
+        except Exception as e:
+            logger.warning(f"[MODULE_EXECUTOR] Failed to close pool: {e}")
+
+    async def _get_pg_pool(self, connection_params: Dict[str, Any]) -> Any:
+        """Get an asyncpg pool (raises ImportError if asyncpg is missing)"""
+        import asyncpg
+
+        ssl_config = self._get_pg_ssl(connection_params)
+
+        return await self._get_pool('postgresql', connection_params, lambda: asyncpg.create_pool(
+            host=connection_params.get('host', 'localhost'),
+            port=connection_params.get('port', 5432),
+            database=connection_params.get('database'),
+            user=connection_params.get('username'),
+            password=connection_params.get('password'),
+            ssl=ssl_config,
+            min_size=1,
+            max_size=connection_params.get('pool_size', 10),
+            # Per-connection LRU of prepared statements used by conn.prepare()
+            statement_cache_size=connection_params.get('statement_cache_size', 100)
+        ))
+
+    def _get_pg_ssl(self, connection_params: Dict[str, Any]) -> Any:
+        """
+        Resolve ssl_mode into the value passed to asyncpg.
+
+        require / verify-ca / verify-full become a cached ssl.SSLContext;
+        disable becomes False; allow / prefer stay as strings since they
+        need asyncpg's plaintext fallback.
+        """
+        ssl_mode = connection_params.get('ssl_mode') or 'prefer'
+        if ssl_mode not in PG_SSL_MODES:
+            raise ValueError(
+                f"Invalid ssl_mode: {ssl_mode!r} (expected one of {', '.join(sorted(PG_SSL_MODES))})"
+            )
+
+        if ssl_mode == 'disable':
+            return False
+        if ssl_mode in ('allow', 'prefer'):
+            return ssl_mode
+
+        root_cert = connection_params.get('ssl_root_cert')
+        key = (ssl_mode, root_cert)
+        context = self._ssl_contexts.get(key)
+        if context is None:
+            context = ssl.create_default_context(cafile=root_cert)
+            if ssl_mode != 'verify-full':
+                # require: encrypt only; verify-ca: trust chain but not hostname
+                context.check_hostname = False
+                if ssl_mode == 'require':
+                    context.verify_mode = ssl.CERT_NONE
+            self._ssl_contexts[key] = context
+        return context
+
+    async def _get_mysql_pool(self, connection_params: Dict[str, Any]) -> Any:
+        """Get an aiomysql pool (raises ImportError if aiomysql is missing)"""
+        import aiomysql
+
+        return await self._get_pool('mysql', connection_params, lambda: aiomysql.create_pool(
+            host=connection_params.get('host', 'localhost'),
+            port=connection_params.get('port', 3306),
+            db=connection_params.get('database'),
+            user=connection_params.get('username'),
+            password=connection_params.get('password'),
+            minsize=1,
+            maxsize=connection_params.get('pool_size', 10)
+        ))
+
+    def _get_http_client(self, scheme: str, host: str, port: Any, username: str) -> Any:
+        """Get the cached keep-alive HTTP client for a destination endpoint"""
+        import httpx
+
+        key = (scheme, host, port, username)
+        client = self._http_clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=f"{scheme}://{host}:{port}",
+                verify=False,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+                timeout=30.0
+            )
+            self._http_clients[key] = client
+        return client
+
+    async def close(self):
+        """Close all cached connection pools and HTTP clients"""
+        pools = list(self._db_connections.values())
+        self._db_connections.clear()
+        self._pool_last_used.clear()
+        self._pool_locks.clear()
+
+        http_clients = list(self._http_clients.values())
+        self._http_clients.clear()
+        for client in http_clients:
+            await client.aclose()
+
+        for pool in pools:
+            await self._close_pool(pool)
+        if self._closing_pools:
+            await asyncio.gather(*self._closing_pools)
 
     async def discover_schema(
         self,
         module_name: str,
         connection_params: Dict[str, Any],
-        include_tables: Optional[List[str]] = None
-    ) -> List[TableSchema]:
+        include_tables: Optional[List[str]] = None,
+        as_dict: bool = False
+    ) -> Union[List[TableSchema], List[Dict[str, Any]]]:
         """
         Discover schema from a source database.
 
         Args:
             module_name: Name of the source module (e.g., 'postgresql', 'mysql')
             connection_params: Database connection parameters
-            include_tables: Optional list of tables to include (filters results)
+            include_tables: Optional "schema.table" names to include (filtered by the discovery query)
+            as_dict: Return plain dicts ready for JSON serialization
 
         Returns:
-            List of TableSchema objects
+            List of TableSchema objects (or dicts if as_dict)
         """
-        module = module_loader.get_source(module_name)
-        if not module:
-            raise ValueError(f"Source module not found: {module_name}")
-
-        query = module_loader.get_schema_discovery_query(module_name)
-        if not query:
-            raise ValueError(f"No schema discovery query for module: {module_name}")
+        query = self._get_discovery_query(module_name)
 
         logger.info(f"[MODULE_EXECUTOR] Discovering schema for {module_name}")
 
         # Execute the discovery query based on module type
         if module_name == 'postgresql':
-            return await self._discover_postgresql_schema(connection_params, query, include_tables)
+            tables = await self._discover_postgresql_schema(connection_params, query, include_tables)
         elif module_name == 'mysql':
-            return await self._discover_mysql_schema(connection_params, query, include_tables)
+            tables = await self._discover_mysql_schema(connection_params, query, include_tables)
         else:
             # Generic approach using async database libraries
             logger.warning(f"[MODULE_EXECUTOR] No specific handler for {module_name}, using generic")
-            return []
+            tables = []
+
+        return [table.to_dict() for table in tables] if as_dict else tables
+
+    async def discover_schema_iter(
+        self,
+        module_name: str,
+        connection_params: Dict[str, Any],
+        include_tables: Optional[List[str]] = None
+    ) -> AsyncIterator[TableSchema]:
+        """
+        Discover schema, yielding each table as soon as its columns are read.
+
+        Rows are streamed from a server-side cursor, so memory stays bounded
+        for very large catalogs. The pooled connection is held until the
+        iterator is exhausted or closed.
+
+        Args:
+            module_name: Name of the source module (e.g., 'postgresql', 'mysql')
+            connection_params: Database connection parameters
+            include_tables: Optional "schema.table" names to include (filtered by the discovery query)
+
+        Yields:
+            TableSchema objects
+        """
+        query = self._get_discovery_query(module_name)
+
+        logger.info(f"[MODULE_EXECUTOR] Streaming schema discovery for {module_name}")
+
+        if module_name == 'postgresql':
+            async for table in self._iter_postgresql_schema(connection_params, query, include_tables):
+                yield table
+        elif module_name == 'mysql':
+            async for table in self._iter_mysql_schema(connection_params, query, include_tables):
+                yield table
+        else:
+            logger.warning(f"[MODULE_EXECUTOR] No specific handler for {module_name}, using generic")
+
+    def _get_discovery_query(self, module_name: str) -> str:
+        """Get a source module's discovery query, validating the module exists"""
+        module = module_loader.get_source(module_name)
+        if not module:
+            raise ValueError(f"Source module not found: {module_name}")
+
+        query = module_loader.get_schema_discovery_query(module_name)
+        if not query:
+            raise ValueError(f"No schema discovery query for module: {module_name}")
+        return query
+
+    @staticmethod
+    def _build_table_schema(
+        schema_name: str,
+        table_name: str,
+        columns: List[SchemaColumn]
+    ) -> TableSchema:
+        """Build a TableSchema, deriving primary keys from its columns"""
+        return TableSchema(
+            schema_name=schema_name,
+            table_name=table_name,
+            columns=columns,
+            primary_keys=[col.name for col in columns if col.is_primary_key]
+        )
 
     async def _discover_postgresql_schema(
         self,
@@ -115,73 +410,60 @@ class ModuleExecutor:
         include_tables: Optional[List[str]] = None
     ) -> List[TableSchema]:
         """Discover PostgreSQL schema"""
+        return [
+            table async for table in self._iter_postgresql_schema(connection_params, query, include_tables)
+        ]
+
+    async def _iter_postgresql_schema(
+        self,
+        connection_params: Dict[str, Any],
+        query: str,
+        include_tables: Optional[List[str]] = None
+    ) -> AsyncIterator[TableSchema]:
+        """
+        Stream PostgreSQL schema one table at a time.
+
+        Relies on the discovery query ordering rows by schema and table, so
+        a table is complete as soon as the next one starts.
+        """
         try:
-            import asyncpg
-
-            conn = await asyncpg.connect(
-                host=connection_params.get('host', 'localhost'),
-                port=connection_params.get('port', 5432),
-                database=connection_params.get('database'),
-                user=connection_params.get('username'),
-                password=connection_params.get('password'),
-                ssl=connection_params.get('ssl_mode', 'prefer')
-            )
+            pool = await self._get_pg_pool(connection_params)
+
+            async with pool.acquire() as conn:
+                # Cursors require a transaction; rows arrive in batches of 1000
+                async with conn.transaction():
+                    current_key: Optional[Tuple[str, str]] = None
+                    columns: List[SchemaColumn] = []
+
+                    # Table filter is applied server-side ($1 = NULL means all tables)
+                    cursor = conn.cursor(query, list(include_tables) if include_tables else None, prefetch=1000)
+                    async for row in cursor:
+                        # Names interned: shared by every column row of a table
+                        schema_name = sys.intern(row['table_schema'])
+                        table_name = sys.intern(row['table_name'])
+
+                        if (schema_name, table_name) != current_key:
+                            if columns:
+                                yield self._build_table_schema(*current_key, columns)
+                            current_key = (schema_name, table_name)
+                            columns = []
+
+                        # Primary key flag comes from the discovery query itself
+                        columns.append(SchemaColumn(
+                            name=row['column_name'],
+                            data_type=row['data_type'],
+                            is_nullable=row['is_nullable'] in NULLABLE_VALUES,
+                            table_schema=schema_name,
+                            table_name=table_name,
+                            is_primary_key=bool(row.get('is_primary_key'))
+                        ))
 
-            try:
-                rows = await conn.fetch(query)
-
-                # Group by table
-                tables: Dict[str, TableSchema] = {}
-                for row in rows:
-                    table_key = f"{row['table_schema']}.{row['table_name']}"
-
-                    # Filter if include_tables specified
-                    if include_tables and table_key not in include_tables:
-                        continue
-
-                    if table_key not in tables:
-                        tables[table_key] = TableSchema(
-                            schema_name=row['table_schema'],
-                            table_name=row['table_name'],
-                            columns=[],
-                            primary_keys=[]
-                        )
-
-                    tables[table_key].columns.append(SchemaColumn(
-                        name=row['column_name'],
-                        data_type=row['data_type'],
-                        is_nullable=row['is_nullable'] == 'YES',
-                        table_schema=row['table_schema'],
-                        table_name=row['table_name']
-                    ))
-
-                # Get primary keys
-                pk_query = """
-                    SELECT tc.table_schema, tc.table_name, kcu.column_name
-                    FROM information_schema.table_constraints tc
-                    JOIN information_schema.key_column_usage kcu
-                        ON tc.constraint_name = kcu.constraint_name
-                    WHERE tc.constraint_type = 'PRIMARY KEY'
-                """
-                pk_rows = await conn.fetch(pk_query)
-
-                for row in pk_rows:
-                    table_key = f"{row['table_schema']}.{row['table_name']}"
-                    if table_key in tables:
-                        tables[table_key].primary_keys.append(row['column_name'])
-                        # Mark column as primary key
-                        for col in tables[table_key].columns:
-                            if col.name == row['column_name']:
-                                col.is_primary_key = True
-
-                return list(tables.values())
-
-            finally:
-                await conn.close()
+                    if columns:
+                        yield self._build_table_schema(*current_key, columns)
 
         except ImportError:
             logger.error("[MODULE_EXECUTOR] asyncpg not installed")
-            return []
+            return
         except Exception as e:
             logger.error(f"[MODULE_EXECUTOR] PostgreSQL schema discovery failed: {e}")
             raise
@@ -193,54 +475,65 @@ class ModuleExecutor:
         include_tables: Optional[List[str]] = None
     ) -> List[TableSchema]:
         """Discover MySQL schema"""
+        return [
+            table async for table in self._iter_mysql_schema(connection_params, query, include_tables)
+        ]
+
+    async def _iter_mysql_schema(
+        self,
+        connection_params: Dict[str, Any],
+        query: str,
+        include_tables: Optional[List[str]] = None
+    ) -> AsyncIterator[TableSchema]:
+        """
+        Stream MySQL schema one table at a time.
+
+        Uses an unbuffered server-side cursor, so the connection is busy
+        until every row has been read; it is only returned to the pool once
+        the iterator is exhausted or closed.
+        """
         try:
             import aiomysql
 
-            conn = await aiomysql.connect(
-                host=connection_params.get('host', 'localhost'),
-                port=connection_params.get('port', 3306),
-                db=connection_params.get('database'),
-                user=connection_params.get('username'),
-                password=connection_params.get('password')
-            )
+            pool = await self._get_mysql_pool(connection_params)
 
-            try:
-                async with conn.cursor(aiomysql.DictCursor) as cursor:
-                    await cursor.execute(query)
-                    rows = await cursor.fetchall()
-
-                    # Group by table
-                    tables: Dict[str, TableSchema] = {}
-                    for row in rows:
-                        table_key = f"{row['TABLE_SCHEMA']}.{row['TABLE_NAME']}"
-
-                        if include_tables and table_key not in include_tables:
-                            continue
-
-                        if table_key not in tables:
-                            tables[table_key] = TableSchema(
-                                schema_name=row['TABLE_SCHEMA'],
-                                table_name=row['TABLE_NAME'],
-                                columns=[],
-                                primary_keys=[]
-                            )
-
-                        tables[table_key].columns.append(SchemaColumn(
+            async with pool.acquire() as conn:
+                async with conn.cursor(aiomysql.SSDictCursor) as cursor:
+                    # Table filter is applied server-side (NULL means all tables)
+                    await cursor.execute(query, {
+                        'include_tables': ','.join(include_tables) if include_tables else None
+                    })
+
+                    current_key: Optional[Tuple[str, str]] = None
+                    columns: List[SchemaColumn] = []
+
+                    async for row in cursor:
+                        # Names interned: shared by every column row of a table
+                        schema_name = sys.intern(row['TABLE_SCHEMA'])
+                        table_name = sys.intern(row['TABLE_NAME'])
+
+                        if (schema_name, table_name) != current_key:
+                            if columns:
+                                yield self._build_table_schema(*current_key, columns)
+                            current_key = (schema_name, table_name)
+                            columns = []
+
+                        # Primary key flag comes from COLUMN_KEY in the discovery query
+                        columns.append(SchemaColumn(
                             name=row['COLUMN_NAME'],
                             data_type=row['DATA_TYPE'],
-                            is_nullable=row['IS_NULLABLE'] == 'YES',
-                            table_schema=row['TABLE_SCHEMA'],
-                            table_name=row['TABLE_NAME']
+                            is_nullable=row['IS_NULLABLE'] in NULLABLE_VALUES,
+                            table_schema=schema_name,
+                            table_name=table_name,
+                            is_primary_key=bool(row.get('is_primary_key'))
                         ))
 
-                    return list(tables.values())
-
-            finally:
-                conn.close()
+                    if columns:
+                        yield self._build_table_schema(*current_key, columns)
 
         except ImportError:
             logger.error("[MODULE_EXECUTOR] aiomysql not installed")
-            return []
+            return
         except Exception as e:
             logger.error(f"[MODULE_EXECUTOR] MySQL schema discovery failed: {e}")
             raise
@@ -302,32 +595,30 @@ class ModuleExecutor:
         recommendations = []
 
         try:
-            import asyncpg
-
-            conn = await asyncpg.connect(
-                host=connection_params.get('host', 'localhost'),
-                port=connection_params.get('port', 5432),
-                database=connection_params.get('database'),
-                user=connection_params.get('username'),
-                password=connection_params.get('password')
-            )
+            pool = await self._get_pg_pool(connection_params)
 
-            try:
-                for check in checks:
+            async with pool.acquire() as conn:
+                # All checks in one round-trip; per-check queries if that fails
+                try:
+                    values = await self._fetch_postgresql_check_values(conn, checks)
+                except Exception as e:
+                    logger.warning(f"[MODULE_EXECUTOR] Batched CDC checks failed, running individually: {e}")
+                    values = None
+
+                for index, check in enumerate(checks):
                     name = check.get('name', 'Unknown')
                     query = check.get('query', '')
-                    expected = check.get('expected')
+                    expected = self._describe_expected(check)
 
                     try:
-                        if query.upper().startswith('SHOW'):
-                            # SHOW commands return differently
-                            row = await conn.fetchrow(query)
-                            actual = list(row.values())[0] if row else None
+                        if values is not None:
+                            actual = values[index]
                         else:
-                            row = await conn.fetchrow(query)
-                            actual = list(row.values())[0] if row else None
+                            stmt = await conn.prepare(query)
+                            row = await stmt.fetchrow()
+                            actual = self._check_value_text(row[0] if row else None)
 
-                        passed = str(actual).lower() == str(expected).lower()
+                        passed = self._check_passed(check, actual)
 
                         results.append({
                             'name': name,
@@ -348,17 +639,7 @@ class ModuleExecutor:
                         missing.append(f"{name}: check failed - {e}")
 
                 # Add recommendations based on failures
-                if any(r['name'] == 'WAL Level' and not r['passed'] for r in results):
-                    recommendations.append(
-                        "Set wal_level = 'logical' in postgresql.conf and restart PostgreSQL"
-                    )
-                if any(r['name'] == 'Replication Permission' and not r['passed'] for r in results):
-                    recommendations.append(
-                        "Grant REPLICATION privilege: ALTER USER username REPLICATION;"
-                    )
-
-            finally:
-                await conn.close()
+                recommendations = self._recommendations_for(results, self._PG_RECOMMENDATIONS)
 
         except ImportError:
             missing.append("asyncpg library not installed")
@@ -367,6 +648,108 @@ class ModuleExecutor:
 
         return results, missing, recommendations
 
+    @staticmethod
+    def _recommendations_for(
+        results: List[Dict[str, Any]],
+        recommendations_by_name: Dict[str, str]
+    ) -> List[str]:
+        """Recommendations for failed checks, from a single pass over results"""
+        failed = {r['name'] for r in results if not r.get('passed')}
+        return [message for name, message in recommendations_by_name.items() if name in failed]
+
+    @staticmethod
+    def _check_passed(check: Dict[str, Any], actual: Any) -> bool:
+        """Compare a check's actual value with its expected / expected_min"""
+        expected_min = check.get('expected_min')
+        if expected_min is not None:
+            try:
+                return int(actual) >= int(expected_min)
+            except (TypeError, ValueError):
+                return False
+        return str(actual).casefold() == str(check.get('expected')).casefold()
+
+    @staticmethod
+    def _check_value_text(value: Any) -> Optional[str]:
+        """
+        A check value as the server's text form, so 'actual' has one type
+        whether it came from the batched query (cast to text) or a single one.
+        """
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value)
+
+    @staticmethod
+    def _describe_expected(check: Dict[str, Any]) -> Any:
+        """Expected value as reported in check results"""
+        if check.get('expected_min') is not None:
+            return f">= {check['expected_min']}"
+        return check.get('expected')
+
+    async def _fetch_postgresql_check_values(
+        self,
+        conn: Any,
+        checks: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Run all PostgreSQL CDC check queries as a single SELECT.
+
+        SHOW <setting> becomes current_setting($n); other queries are used as
+        scalar subqueries. Values come back as text, in check order. The
+        statement is prepared once per pooled connection and re-executed
+        from the connection's statement cache on later calls.
+        """
+        columns = []
+        params = []
+        for check in checks:
+            query = check.get('query', '').strip().rstrip(';')
+            show_match = PG_SHOW_PATTERN.match(query)
+            if show_match:
+                params.append(show_match.group(1))
+                columns.append(f"current_setting(${len(params)})")
+            else:
+                columns.append(f"({query})::text")
+
+        stmt = await conn.prepare(f"SELECT {', '.join(columns)}")
+        row = await stmt.fetchrow(*params)
+        return list(row)
+
+    async def _fetch_mysql_check_values(
+        self,
+        cursor: Any,
+        checks: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Resolve MySQL CDC check values in check order.
+
+        All SHOW VARIABLES LIKE '<name>' checks are answered by one
+        SHOW VARIABLES WHERE Variable_name IN (...) query; any other check
+        query runs on its own and contributes its first column.
+        """
+        variable_names = []
+        for check in checks:
+            show_match = MYSQL_SHOW_VARIABLE_PATTERN.match(check.get('query', ''))
+            variable_names.append(show_match.group(1) if show_match else None)
+
+        variables: Dict[str, Any] = {}
+        requested = [name for name in variable_names if name]
+        if requested:
+            placeholders = ', '.join(['%s'] * len(requested))
+            await cursor.execute(f"SHOW VARIABLES WHERE Variable_name IN ({placeholders})", requested)
+            for row in await cursor.fetchall():
+                variables[row['Variable_name']] = row['Value']
+
+        values = []
+        for check, variable_name in zip(checks, variable_names):
+            if variable_name:
+                values.append(variables.get(variable_name))
+            else:
+                await cursor.execute(check.get('query', ''))
+                row = await cursor.fetchone()
+                values.append(self._check_value_text(next(iter(row.values())) if row else None))
+        return values
+
     async def _check_mysql_cdc(
         self,
         connection_params: Dict[str, Any],
@@ -380,27 +763,34 @@ class ModuleExecutor:
         try:
             import aiomysql
 
-            conn = await aiomysql.connect(
-                host=connection_params.get('host', 'localhost'),
-                port=connection_params.get('port', 3306),
-                db=connection_params.get('database'),
-                user=connection_params.get('username'),
-                password=connection_params.get('password')
-            )
+            pool = await self._get_mysql_pool(connection_params)
 
-            try:
+            async with pool.acquire() as conn:
                 async with conn.cursor(aiomysql.DictCursor) as cursor:
-                    for check in checks:
+                    # SHOW VARIABLES checks batched; per-check queries if that fails
+                    try:
+                        values = await self._fetch_mysql_check_values(cursor, checks)
+                    except Exception as e:
+                        logger.warning(f"[MODULE_EXECUTOR] Batched CDC checks failed, running individually: {e}")
+                        values = None
+
+                    for index, check in enumerate(checks):
                         name = check.get('name', 'Unknown')
                         query = check.get('query', '')
-                        expected = check.get('expected')
+                        expected = self._describe_expected(check)
 
                         try:
-                            await cursor.execute(query)
-                            row = await cursor.fetchone()
-                            actual = list(row.values())[0] if row else None
-
-                            passed = str(actual).lower() == str(expected).lower()
+                            if values is not None:
+                                actual = values[index]
+                            else:
+                                await cursor.execute(query)
+                                row = await cursor.fetchone()
+                                # SHOW VARIABLES rows are (Variable_name, Value)
+                                actual = self._check_value_text(row['Value'] if row and 'Value' in row else (
+                                    next(iter(row.values())) if row else None
+                                ))
+
+                            passed = self._check_passed(check, actual)
 
                             results.append({
                                 'name': name,
@@ -421,17 +811,7 @@ class ModuleExecutor:
                             missing.append(f"{name}: check failed - {e}")
 
                 # Add recommendations
-                if any(r['name'] == 'Binary Log' and not r['passed'] for r in results):
-                    recommendations.append(
-                        "Enable binary logging: SET GLOBAL log_bin = ON; (requires restart)"
-                    )
-                if any(r['name'] == 'Binary Log Format' and not r['passed'] for r in results):
-                    recommendations.append(
-                        "Set binlog format: SET GLOBAL binlog_format = 'ROW';"
-                    )
-
-            finally:
-                conn.close()
+                recommendations = self._recommendations_for(results, self._MYSQL_RECOMMENDATIONS)
 
         except ImportError:
             missing.append("aiomysql library not installed")
@@ -499,31 +879,29 @@ class ModuleExecutor:
     ) -> bool:
         """Create a ClickHouse table"""
         try:
-            import httpx
-
             host = connection_params.get('host', 'localhost')
             port = connection_params.get('port', 8123)
             username = connection_params.get('username', 'default')
             password = connection_params.get('password', '')
             database = connection_params.get('database', 'default')
+            # 'ssl' is the ClickHouse module's optional credential (default true)
+            scheme = 'https' if connection_params.get('ssl', True) else 'http'
+
+            client = self._get_http_client(scheme, host, port, username)
+            response = await client.post(
+                "/",
+                content=create_sql,
+                params={'database': database},
+                auth=(username, password) if username else None,
+                headers={'Content-Type': 'text/plain'}
+            )
 
-            url = f"https://{host}:{port}/"
-
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.post(
-                    url,
-                    content=create_sql,
-                    params={'database': database},
-                    auth=(username, password) if username else None,
-                    headers={'Content-Type': 'text/plain'}
-                )
-
-                if response.status_code == 200:
-                    logger.info("[MODULE_EXECUTOR] ClickHouse table created successfully")
-                    return True
-                else:
-                    logger.error(f"[MODULE_EXECUTOR] ClickHouse error: {response.text}")
-                    return False
+            if response.status_code == 200:
+                logger.info("[MODULE_EXECUTOR] ClickHouse table created successfully")
+                return True
+            else:
+                logger.error(f"[MODULE_EXECUTOR] ClickHouse error: {response.text}")
+                return False
 
         except ImportError:
             logger.error("[MODULE_EXECUTOR] httpx not installed")
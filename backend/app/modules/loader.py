@@ -19,17 +19,24 @@ Usage:
     })
 """
 
+import os
 import yaml
+import functools
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Tuple, Iterator, KeysView, NamedTuple
 from dataclasses import dataclass, field
 from jinja2 import Template, Environment, BaseLoader
 
 logger = logging.getLogger(__name__)
 
+# Prefer the LibYAML-backed loader; fall back to pure Python if unavailable
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+if YamlLoader is yaml.SafeLoader:
+    logger.warning("[MODULE_LOADER] LibYAML not available, using the pure-Python YAML parser")
 
-@dataclass
+
+@dataclass(slots=True)
 class ModuleInfo:
     """Basic module information"""
     type: str              # source, destination, transform
@@ -39,9 +46,8 @@ class ModuleInfo:
     version: str           # 1.0.0
 
 
-@dataclass
-class CredentialField:
-    """A credential field definition"""
+class CredentialField(NamedTuple):
+    """A credential field definition (immutable)"""
     name: str
     type: str              # string, integer, password, select
     label: str
@@ -49,10 +55,10 @@ class CredentialField:
     default: Any = None
     placeholder: str = ""
     encrypted: bool = False
-    options: List[str] = field(default_factory=list)
+    options: Tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleCapabilities:
     """What a module can do"""
     supports_cdc: bool = False
@@ -64,7 +70,7 @@ class ModuleCapabilities:
     supported_formats: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleConfig:
     """Complete module configuration"""
     info: ModuleInfo
@@ -77,7 +83,15 @@ class ModuleConfig:
     schema_discovery: Dict[str, Any] = field(default_factory=dict)
     cdc_readiness_check: Dict[str, Any] = field(default_factory=dict)
     cost_factors: Dict[str, float] = field(default_factory=dict)
-    raw_config: Dict[str, Any] = field(default_factory=dict)
+    # Templates compiled once when the module is loaded
+    render_connector: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = field(default=None, repr=False)
+    compiled_table_template: Optional[Template] = field(default=None, repr=False)
+    # Source lookups extracted once from schema_discovery / cdc_readiness_check
+    schema_discovery_query: Optional[str] = None
+    cdc_readiness_queries: List[Dict[str, Any]] = field(default_factory=list)
+    # type_mapping lowercased, and as (key, type) pairs longest key first
+    type_mapping_lower: Dict[str, str] = field(default_factory=dict, repr=False)
+    type_mapping_substrings: Tuple[Tuple[str, str], ...] = field(default=(), repr=False)
 
 
 class ModuleLoader:
@@ -90,89 +104,130 @@ class ModuleLoader:
     - No code changes required!
     """
 
+    # Parsed YAML by (resolved path, mtime_ns), shared by all loaders in the
+    # process: re-instantiating or reload() only re-parses changed files
+    _yaml_cache: Dict[Tuple[str, int], Dict] = {}
+
     def __init__(self, config_dir: Optional[str] = None):
         if config_dir is None:
             # Default to the configs directory relative to this file
             config_dir = Path(__file__).parent / "configs"
         self.config_dir = Path(config_dir)
 
-        self._sources: Dict[str, ModuleConfig] = {}
-        self._destinations: Dict[str, ModuleConfig] = {}
-        self._transforms: Dict[str, Dict[str, Any]] = {}
+        # Config file paths by module name, indexed at startup
+        self._source_paths: Dict[str, Path] = {}
+        self._destination_paths: Dict[str, Path] = {}
+        self._transform_paths: Dict[str, Path] = {}
+
+        # Parsed modules by name, filled on first use (None if the config is invalid)
+        self._sources: Dict[str, Optional[ModuleConfig]] = {}
+        self._destinations: Dict[str, Optional[ModuleConfig]] = {}
+        self._transforms: Dict[str, Optional[Dict[str, Any]]] = {}
 
-        # Jinja2 environment for template rendering
+        # Display listings, built on first request (reset by reload())
+        self._source_info_cache: Optional[List[Dict[str, Any]]] = None
+        self._destination_info_cache: Optional[List[Dict[str, Any]]] = None
+
+        # Memoized type mapping
+        self.map_type = functools.lru_cache(maxsize=2048)(self._map_type)
+
+        # Jinja2 environment for template rendering (shared by all modules)
         self._jinja_env = Environment(loader=BaseLoader())
         self._jinja_env.filters['join'] = lambda x, sep=',': sep.join(x) if isinstance(x, list) else x
 
-        self._load_all_modules()
-
-    def _load_all_modules(self):
-        """Load all module configs at startup"""
-        sources_dir = self.config_dir / "sources"
-        destinations_dir = self.config_dir / "destinations"
-        transforms_dir = self.config_dir / "transforms"
-
-        # Load sources
-        if sources_dir.exists():
-            for config_file in sources_dir.glob("*.yaml"):
-                try:
-                    config = self._load_source_config(config_file)
-                    if config:
-                        self._sources[config.info.name] = config
-                        logger.info(f"[MODULE_LOADER] Loaded source: {config.info.name}")
-                except Exception as e:
-                    logger.error(f"[MODULE_LOADER] Failed to load source {config_file}: {e}")
-
-        # Load destinations
-        if destinations_dir.exists():
-            for config_file in destinations_dir.glob("*.yaml"):
-                try:
-                    config = self._load_destination_config(config_file)
-                    if config:
-                        self._destinations[config.info.name] = config
-                        logger.info(f"[MODULE_LOADER] Loaded destination: {config.info.name}")
-                except Exception as e:
-                    logger.error(f"[MODULE_LOADER] Failed to load destination {config_file}: {e}")
-
-        # Load transforms
-        if transforms_dir.exists():
-            for config_file in transforms_dir.glob("*.yaml"):
-                try:
-                    with open(config_file) as f:
-                        config = yaml.safe_load(f)
-                    if config and 'transform' in config:
-                        name = config['transform']['name']
-                        self._transforms[name] = config
-                        logger.info(f"[MODULE_LOADER] Loaded transform: {name}")
-                except Exception as e:
-                    logger.error(f"[MODULE_LOADER] Failed to load transform {config_file}: {e}")
+        self._index_all_modules()
+
+    def _index_all_modules(self):
+        """
+        Index module config files by name (file stem) at startup.
+
+        Configs are parsed on first use by get_source / get_destination /
+        get_transform, so startup cost no longer grows with unused modules.
+        """
+        for paths, subdir in (
+            (self._source_paths, "sources"),
+            (self._destination_paths, "destinations"),
+            (self._transform_paths, "transforms"),
+        ):
+            for config_file in self._iter_yaml_files(self.config_dir / subdir):
+                paths[config_file.stem] = config_file
 
         logger.info(
-            f"[MODULE_LOADER] Loaded {len(self._sources)} sources, "
-            f"{len(self._destinations)} destinations, "
-            f"{len(self._transforms)} transforms"
+            f"[MODULE_LOADER] Indexed {len(self._source_paths)} sources, "
+            f"{len(self._destination_paths)} destinations, "
+            f"{len(self._transform_paths)} transforms"
         )
 
+    def _load_module(
+        self,
+        kind: str,
+        name: str,
+        paths: Dict[str, Path],
+        loaded: Dict[str, Any],
+        load_config: Callable[[Path], Any]
+    ) -> Any:
+        """Parse an indexed module on first use (failures are cached as None)"""
+        if name in loaded:
+            return loaded[name]
+
+        path = paths.get(name)
+        if path is None:
+            return None
+
+        try:
+            config = load_config(path)
+            if config:
+                logger.info(f"[MODULE_LOADER] Loaded {kind}: {name}")
+        except Exception as e:
+            logger.error(f"[MODULE_LOADER] Failed to load {kind} {path}: {e}")
+            config = None
+
+        loaded[name] = config
+        return config
+
     def _load_yaml(self, path: Path) -> Dict:
-        """Load and parse YAML config"""
-        with open(path) as f:
-            return yaml.safe_load(f)
+        """Load and parse YAML config, reusing the parsed cache when possible"""
+        key = self._yaml_key(path)
+        if key not in self._yaml_cache:
+            with open(path) as f:
+                self._yaml_cache[key] = yaml.load(f, Loader=YamlLoader)
+        return self._yaml_cache[key]
+
+    @staticmethod
+    def _yaml_key(path: Path) -> Tuple[str, int]:
+        """Cache key for a config file: (resolved path, mtime_ns)"""
+        return str(path.resolve()), path.stat().st_mtime_ns
+
+    @staticmethod
+    def _iter_yaml_files(directory: Path) -> Iterator[Path]:
+        """
+        Yield the *.yaml files directly inside a directory.
 
-    def _parse_credentials(self, creds_config: List[Dict]) -> List[CredentialField]:
+        os.scandir reuses the dirent file type, so unlike Path.glob there is
+        no per-entry stat() or pattern matching.
+        """
+        if not directory.is_dir():
+            return
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.yaml') and entry.is_file():
+                    yield Path(entry.path)
+
+    def _parse_credentials(self, creds_config: List[Dict], required: bool = True) -> List[CredentialField]:
         """Parse credential field definitions"""
-        fields = []
-        for cred in creds_config:
-            fields.append(CredentialField(
+        return [
+            CredentialField(
                 name=cred.get('name', ''),
                 type=cred.get('type', 'string'),
                 label=cred.get('label', cred.get('name', '')),
-                required=True,
+                required=required,
                 default=cred.get('default'),
                 placeholder=cred.get('placeholder', ''),
                 encrypted=cred.get('encrypted', False),
-                options=cred.get('options', [])
-            ))
-        return fields
+                options=tuple(cred.get('options', ()))
+            )
+            for cred in creds_config
+        ]
 
     def _load_source_config(self, path: Path) -> Optional[ModuleConfig]:
         """Load a source module configuration"""
@@ -199,16 +254,22 @@ class ModuleLoader:
             supported_formats=capabilities_raw.get('supported_formats', ['avro', 'json'])
         )
 
+        connector_template = raw.get('connector_template', {})
+        schema_discovery = raw.get('schema_discovery') or {}
+        cdc_readiness_check = raw.get('cdc_readiness_check') or {}
+
         return ModuleConfig(
             info=info,
             capabilities=capabilities,
             required_credentials=self._parse_credentials(credentials_raw.get('required', [])),
-            optional_credentials=self._parse_credentials(credentials_raw.get('optional', [])),
-            connector_template=raw.get('connector_template', {}),
-            schema_discovery=raw.get('schema_discovery', {}),
-            cdc_readiness_check=raw.get('cdc_readiness_check', {}),
+            optional_credentials=self._parse_credentials(credentials_raw.get('optional', []), required=False),
+            connector_template=connector_template,
+            schema_discovery=schema_discovery,
+            cdc_readiness_check=cdc_readiness_check,
             cost_factors=raw.get('cost_factors', {}),
-            raw_config=raw
+            render_connector=self._compile_connector_renderer(connector_template),
+            schema_discovery_query=schema_discovery.get('query'),
+            cdc_readiness_queries=cdc_readiness_check.get('queries') or []
         )
 
     def _load_destination_config(self, path: Path) -> Optional[ModuleConfig]:
@@ -236,45 +297,83 @@ class ModuleLoader:
             supported_formats=capabilities_raw.get('supported_formats', ['avro', 'json'])
         )
 
+        connector_template = raw.get('connector_template', {})
+        table_template = raw.get('table_template', '')
+        type_mapping = raw.get('type_mapping', {})
+        type_mapping_lower = {str(key).lower(): value for key, value in type_mapping.items()}
+
         return ModuleConfig(
             info=info,
             capabilities=capabilities,
             required_credentials=self._parse_credentials(credentials_raw.get('required', [])),
-            optional_credentials=self._parse_credentials(credentials_raw.get('optional', [])),
-            connector_template=raw.get('connector_template', {}),
-            type_mapping=raw.get('type_mapping', {}),
-            table_template=raw.get('table_template', ''),
+            optional_credentials=self._parse_credentials(credentials_raw.get('optional', []), required=False),
+            connector_template=connector_template,
+            type_mapping=type_mapping,
+            table_template=table_template,
             cost_factors=raw.get('cost_factors', {}),
-            raw_config=raw
+            render_connector=self._compile_connector_renderer(connector_template),
+            compiled_table_template=self._jinja_env.from_string(table_template) if table_template else None,
+            type_mapping_lower=type_mapping_lower,
+            # Longest first so e.g. 'bigint unsigned' matches 'bigint', not 'int'
+            type_mapping_substrings=tuple(sorted(
+                ((key, value) for key, value in type_mapping_lower.items() if key != 'default'),
+                key=lambda item: -len(item[0])
+            ))
         )
 
+    def _load_transform_config(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Load a transform configuration"""
+        config = self._load_yaml(path)
+        if not config or 'transform' not in config:
+            return None
+        return config
+
     def get_source(self, name: str) -> Optional[ModuleConfig]:
         """Get a source module configuration by name"""
-        return self._sources.get(name)
+        return self._load_module('source', name, self._source_paths, self._sources, self._load_source_config)
 
     def get_destination(self, name: str) -> Optional[ModuleConfig]:
         """Get a destination module configuration by name"""
-        return self._destinations.get(name)
+        return self._load_module(
+            'destination', name, self._destination_paths, self._destinations, self._load_destination_config
+        )
 
     def get_transform(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a transform configuration by name"""
-        return self._transforms.get(name)
+        return self._load_module(
+            'transform', name, self._transform_paths, self._transforms, self._load_transform_config
+        )
+
+    def list_sources(self) -> KeysView[str]:
+        """List all available source module names (live view, no copy)"""
+        return self._source_paths.keys()
+
+    def list_destinations(self) -> KeysView[str]:
+        """List all available destination module names (live view, no copy)"""
+        return self._destination_paths.keys()
 
-    def list_sources(self) -> List[str]:
-        """List all available source module names"""
-        return list(self._sources.keys())
+    def list_transforms(self) -> KeysView[str]:
+        """List all available transform names (live view, no copy)"""
+        return self._transform_paths.keys()
 
-    def list_destinations(self) -> List[str]:
-        """List all available destination module names"""
-        return list(self._destinations.keys())
+    def has_source(self, name: str) -> bool:
+        """Check whether a source module exists (without parsing it)"""
+        return name in self._source_paths
 
-    def list_transforms(self) -> List[str]:
-        """List all available transform names"""
-        return list(self._transforms.keys())
+    def has_destination(self, name: str) -> bool:
+        """Check whether a destination module exists (without parsing it)"""
+        return name in self._destination_paths
+
+    def has_transform(self, name: str) -> bool:
+        """Check whether a transform exists (without parsing it)"""
+        return name in self._transform_paths
 
     def get_source_info(self) -> List[Dict[str, Any]]:
-        """Get display info for all sources"""
-        return [
+        """Get display info for all sources (parses any not yet loaded)"""
+        if self._source_info_cache is not None:
+            return self._source_info_cache
+
+        self._source_info_cache = [
             {
                 'name': config.info.name,
                 'display_name': config.info.display_name,
@@ -282,20 +381,25 @@ class ModuleLoader:
                 'supports_cdc': config.capabilities.supports_cdc,
                 'supports_full_load': config.capabilities.supports_full_load
             }
-            for config in self._sources.values()
+            for config in map(self.get_source, self._source_paths) if config
         ]
+        return self._source_info_cache
 
     def get_destination_info(self) -> List[Dict[str, Any]]:
-        """Get display info for all destinations"""
-        return [
+        """Get display info for all destinations (parses any not yet loaded)"""
+        if self._destination_info_cache is not None:
+            return self._destination_info_cache
+
+        self._destination_info_cache = [
             {
                 'name': config.info.name,
                 'display_name': config.info.display_name,
                 'icon': config.info.icon,
                 'supports_upsert': config.capabilities.supports_upsert
             }
-            for config in self._destinations.values()
+            for config in map(self.get_destination, self._destination_paths) if config
         ]
+        return self._destination_info_cache
 
     def render_connector_config(
         self,
@@ -316,29 +420,74 @@ class ModuleLoader:
         Returns:
             Rendered connector configuration ready for Kafka Connect
         """
-        module = self._sources.get(module_name) or self._destinations.get(module_name)
+        module = self.get_source(module_name) or self.get_destination(module_name)
         if not module:
             raise ValueError(f"Module not found: {module_name}")
 
-        connector_template = module.connector_template
-        if 'config' not in connector_template:
-            return {}
-
-        # Convert template config to YAML string for Jinja2 rendering
-        template_str = yaml.dump(connector_template['config'])
+        return module.render_connector(context)
 
-        # Render with Jinja2
-        template = self._jinja_env.from_string(template_str)
-        rendered_str = template.render(**context)
+    def _compile_connector_renderer(
+        self,
+        connector_template: Dict[str, Any]
+    ) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Compile a connector template into a render function.
 
-        # Parse back to dictionary
-        rendered_config = yaml.safe_load(rendered_str)
+        Values are rendered individually, so quotes inside templates or
+        rendered credentials can't break a YAML round-trip.
+        """
+        if 'config' not in connector_template:
+            return lambda context: {}
 
-        # Add the connector class
+        # Bake the connector class into the template once (on a copy: the
+        # parsed YAML is shared through the cache)
+        config = dict(connector_template['config'])
         if 'class' in connector_template:
-            rendered_config['connector.class'] = connector_template['class']
+            config['connector.class'] = connector_template['class']
 
-        return rendered_config
+        return self._compile_tree(config)
+
+    def _compile_tree(self, node: Any) -> Callable[[Dict[str, Any]], Any]:
+        """
+        Compile a config tree into a function that renders it for a context.
+
+        Dicts and lists are walked once here; only string leaves containing
+        Jinja2 syntax are compiled, and every other leaf is returned as-is.
+        Subtrees without any Jinja2 syntax skip Jinja2 entirely and are just
+        copied, so callers can't mutate the parsed config.
+        """
+        if not self._contains_jinja(node):
+            if isinstance(node, (dict, list)):
+                return lambda context: self._copy_tree(node)
+            return lambda context: node
+        if isinstance(node, dict):
+            children = [(key, self._compile_tree(value)) for key, value in node.items()]
+            return lambda context: {key: render(context) for key, render in children}
+        if isinstance(node, list):
+            items = [self._compile_tree(value) for value in node]
+            return lambda context: [render(context) for render in items]
+        if isinstance(node, str) and ('{{' in node or '{%' in node):
+            template = self._jinja_env.from_string(node)
+            return lambda context: template.render(**context)
+        return lambda context: node
+
+    @staticmethod
+    def _contains_jinja(node: Any) -> bool:
+        """Check whether any string in a config tree contains Jinja2 syntax"""
+        if isinstance(node, dict):
+            return any(ModuleLoader._contains_jinja(value) for value in node.values())
+        if isinstance(node, list):
+            return any(ModuleLoader._contains_jinja(value) for value in node)
+        return isinstance(node, str) and ('{{' in node or '{%' in node)
+
+    @staticmethod
+    def _copy_tree(node: Any) -> Any:
+        """Copy the dicts and lists of a parsed config (leaves are immutable)"""
+        if isinstance(node, dict):
+            return {key: ModuleLoader._copy_tree(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [ModuleLoader._copy_tree(value) for value in node]
+        return node
 
     def render_table_template(
         self,
@@ -359,14 +508,13 @@ class ModuleLoader:
         Returns:
             SQL CREATE TABLE statement
         """
-        module = self._destinations.get(module_name)
-        if not module or not module.table_template:
+        module = self.get_destination(module_name)
+        if not module or not module.compiled_table_template:
             raise ValueError(f"Destination module or table template not found: {module_name}")
 
-        template = self._jinja_env.from_string(module.table_template)
-        return template.render(**context)
+        return module.compiled_table_template.render(**context)
 
-    def map_type(
+    def _map_type(
         self,
         module_name: str,
         source_type: str
@@ -374,6 +522,8 @@ class ModuleLoader:
         """
         Map a source data type to destination type.
 
+        Exposed as self.map_type, wrapped in an LRU cache that reload() clears.
+
         Args:
             module_name: Name of the destination module
             source_type: Source database type (e.g., 'varchar', 'integer')
@@ -381,50 +531,51 @@ class ModuleLoader:
         Returns:
             Destination type (e.g., 'String', 'Int32')
         """
-        module = self._destinations.get(module_name)
+        module = self.get_destination(module_name)
         if not module:
             return source_type
 
         # Try exact match first
         source_lower = source_type.lower()
-        if source_lower in module.type_mapping:
-            return module.type_mapping[source_lower]
+        mapped = module.type_mapping_lower.get(source_lower)
+        if mapped is not None:
+            return mapped
 
-        # Try partial match
-        for key, value in module.type_mapping.items():
+        # Try partial match (most specific key first)
+        for key, value in module.type_mapping_substrings:
             if key in source_lower:
                 return value
 
         # Default to String if no mapping found
-        return module.type_mapping.get('default', 'String')
+        return module.type_mapping_lower.get('default', 'String')
 
     def get_schema_discovery_query(self, module_name: str) -> Optional[str]:
         """Get the schema discovery SQL query for a source module"""
-        module = self._sources.get(module_name)
-        if module and module.schema_discovery:
-            return module.schema_discovery.get('query')
-        return None
+        module = self.get_source(module_name)
+        return module.schema_discovery_query if module else None
 
     def get_cdc_readiness_checks(self, module_name: str) -> List[Dict[str, Any]]:
         """Get CDC readiness check queries for a source module"""
-        module = self._sources.get(module_name)
-        if module and module.cdc_readiness_check:
-            return module.cdc_readiness_check.get('queries', [])
-        return []
+        module = self.get_source(module_name)
+        return module.cdc_readiness_queries if module else []
 
     def get_cost_factors(self, module_name: str) -> Dict[str, float]:
         """Get cost factors for a module"""
-        module = self._sources.get(module_name) or self._destinations.get(module_name)
-        if module:
-            return module.cost_factors
-        return {}
+        module = self.get_source(module_name) or self.get_destination(module_name)
+        return module.cost_factors if module else {}
 
     def reload(self):
         """Reload all module configurations"""
+        self._source_paths.clear()
+        self._destination_paths.clear()
+        self._transform_paths.clear()
         self._sources.clear()
         self._destinations.clear()
         self._transforms.clear()
-        self._load_all_modules()
+        self._source_info_cache = None
+        self._destination_info_cache = None
+        self.map_type.cache_clear()
+        self._index_all_modules()
 
 
 # Singleton instance
@@ -4,14 +4,173 @@ Handles alert rule management and email notifications via SMTP (Mailhog for deve
 """
 
 import os
+import logging
+import time
+import asyncio
+import queue
+import atexit
 import smtplib
+import threading
+import socket
+import ipaddress
 import uuid
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import hashlib
+import base64
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.header import Header
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from jinja2 import Environment
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.db.models import AlertRule, AlertHistory, Pipeline
+from app.services.db_service import db_service
+from app.utils.id_utils import uuid7
+
+logger = logging.getLogger(__name__)
+
+# Idle SMTP connections kept open, and messages sent before a connection is recycled
+SMTP_POOL_MAX = int(os.getenv("SMTP_POOL_MAX", "5"))
+SMTP_POOL_MSGS_PER_CONN = int(os.getenv("SMTP_POOL_MSGS_PER_CONN", "100"))
+SMTP_TIMEOUT_SECONDS = 10
+
+# How long a resolved SMTP host address is reused (dropped early on connect failure)
+SMTP_DNS_TTL_SECONDS = 300
+
+# Background delivery retries (exponential backoff: 1s, 2s, 4s, ...)
+EMAIL_MAX_RETRIES = int(os.getenv("ALERT_EMAIL_MAX_RETRIES", "5"))
+
+# How long send_alert trusts a cached rule before re-reading it
+RULE_CACHE_TTL_SECONDS = 60
+
+# Duplicate-anomaly collapsing, configured per rule in threshold_config:
+#   sampling: "first" keeps the first alert, "last" overwrites it with the latest
+#             anomaly, "disabled" records every alert
+#   cache_minutes: window during which identical anomalies are collapsed (0 = off)
+DEDUPE_SAMPLING_MODES = ('first', 'last', 'disabled')
+DEDUPE_DEFAULT_SAMPLING = 'first'
+DEDUPE_DEFAULT_CACHE_MINUTES = 0
+DEDUPE_PRUNE_THRESHOLD = 1024
+
+ALL_HOURS_MASK = (1 << 24) - 1
+
+# Severity label colors in alert emails (unknown severities use the info color)
+SEVERITY_COLORS = {'critical': '#dc3545', 'warning': '#ffc107', 'info': '#17a2b8'}
+
+# multipart/alternative (plain + HTML) email layout; both parts are base64 so the
+# fixed boundary (containing "=_", which base64 never emits) cannot collide
+EMAIL_MIME_BOUNDARY = "=_dataflow_alert_part"
+EMAIL_MIME_TEMPLATE = (
+    'Content-Type: multipart/alternative; boundary="{boundary}"\n'
+    'MIME-Version: 1.0\n'
+    'Subject: {{subject}}\n'
+    'From: {from_email}\n'
+    'To: {{to}}\n'
+    '\n'
+    '--{boundary}\n'
+    'Content-Type: text/plain; charset="utf-8"\n'
+    'Content-Transfer-Encoding: base64\n'
+    '\n'
+    '{{text_body}}'
+    '--{boundary}\n'
+    'Content-Type: text/html; charset="utf-8"\n'
+    'Content-Transfer-Encoding: base64\n'
+    '\n'
+    '{{html_body}}'
+    '--{boundary}--\n'
+)
+
+# Compiled once at import; autoescape keeps rule names / anomaly text from injecting HTML
+EMAIL_BODY_TEMPLATE = Environment(autoescape=True).from_string("""
+        <html>
+        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 8px;">
+                <h2 style="color: #dc3545; margin-top: 0;">
+                    DataFlow Alert: {{ anomaly.get('type', 'Anomaly Detected') }}
+                </h2>
+
+                <div style="background: white; padding: 15px; border-radius: 4px; margin: 15px 0;">
+                    <p><strong>Rule:</strong> {{ rule.name }}</p>
+                    <p><strong>Type:</strong> {{ rule.rule_type }}</p>
+                    <p><strong>Severity:</strong> <span style="color: {{ severity_color }};">{{ rule.severity.upper() }}</span></p>
+                    <p><strong>Message:</strong> {{ anomaly.get('message', 'N/A') }}</p>
+                </div>
+
+                {% if details %}<h3>Details</h3><ul>{% for key, value in details.items() %}<li><strong>{{ key }}:</strong> {{ value }}</li>{% endfor %}</ul>{% endif %}
+
+                <p style="color: #6c757d; font-size: 12px; margin-top: 20px;">
+                    This alert was sent by DataFlow AI at {{ sent_at }}
+                </p>
+            </div>
+        </body>
+        </html>
+        """)
+
+class _ResolvedSMTP(smtplib.SMTP):
+    """
+    SMTP client that dials a pre-resolved address.
+
+    connect() still records the real hostname, so STARTTLS verifies the
+    certificate (and sends SNI) for the host rather than the IP.
+    """
+
+    def __init__(self, host: str, address: str, port: int, timeout: float):
+        self._connect_address = address
+        super().__init__(host, port, timeout=timeout)
+
+    def _get_socket(self, host, port, timeout):
+        return super()._get_socket(self._connect_address, port, timeout)
+
+
+@dataclass(slots=True)
+class _PooledSMTP:
+    """An open SMTP connection and how many messages it has sent"""
+    server: smtplib.SMTP
+    messages_sent: int = 0
+
+
+@dataclass(slots=True)
+class _CachedRule:
+    """The AlertRule fields send_alert needs, cached between anomaly checks"""
+    id: str
+    name: str
+    rule_type: str
+    severity: str
+    is_active: bool
+    enabled_days: List[int]
+    enabled_hours: Optional[List[int]]
+    cooldown_minutes: int
+    recipients: List[str]
+    threshold_config: Dict[str, Any]
+    last_triggered_at: Optional[datetime]
+    cached_at: float
+    # Bit d / h set when weekday d / hour h is enabled (no hour restriction = all 24 bits)
+    days_mask: int = 0
+    hours_mask: int = ALL_HOURS_MASK
+
+    @classmethod
+    def from_model(cls, rule, cached_at: float) -> "_CachedRule":
+        return cls(
+            id=rule.id,
+            name=rule.name,
+            rule_type=rule.rule_type,
+            severity=rule.severity,
+            is_active=rule.is_active,
+            enabled_days=rule.enabled_days or [],
+            enabled_hours=rule.enabled_hours,
+            cooldown_minutes=rule.cooldown_minutes,
+            recipients=rule.recipients or [],
+            threshold_config=rule.threshold_config or {},
+            last_triggered_at=rule.last_triggered_at,
+            cached_at=cached_at,
+            days_mask=sum(1 << day for day in set(rule.enabled_days or [])),
+            hours_mask=sum(1 << hour for hour in set(rule.enabled_hours)) if rule.enabled_hours else ALL_HOURS_MASK
+        )
 
 
 class AlertService:
@@ -24,24 +183,91 @@ class AlertService:
         self.smtp_use_tls = os.getenv("SMTP_USE_TLS", "false").lower() == "true"
         self.from_email = os.getenv("ALERT_FROM_EMAIL", "alerts@dataflow-ai.local")
 
-    def is_alert_day(self, enabled_days: List[int]) -> bool:
-        """Check if today is an enabled alert day (0=Monday, 6=Sunday)"""
-        current_day = datetime.utcnow().weekday()
-        return current_day in enabled_days
-
-    def is_alert_hour(self, enabled_hours: Optional[List[int]]) -> bool:
-        """Check if current hour is in enabled hours"""
-        if not enabled_hours:
-            return True  # No hour restriction
-        current_hour = datetime.utcnow().hour
-        return current_hour in enabled_hours
-
-    def check_cooldown(self, last_triggered_at: Optional[datetime], cooldown_minutes: int) -> bool:
-        """Check if cooldown period has passed. Returns True if can send alert."""
-        if not last_triggered_at:
-            return True
-        elapsed = (datetime.utcnow() - last_triggered_at).total_seconds() / 60
-        return elapsed >= cooldown_minutes
+        # Email layout with the boundary and From header already filled in
+        self._message_template = EMAIL_MIME_TEMPLATE.format(
+            boundary=EMAIL_MIME_BOUNDARY, from_email=self.from_email
+        )
+
+        # Resolved SMTP address and when it was resolved (see _smtp_address)
+        self._smtp_addr: Optional[Tuple[str, float]] = None
+
+        # Reusable SMTP connections (skips TCP/EHLO/STARTTLS per alert)
+        self._smtp_pool: "queue.LifoQueue[_PooledSMTP]" = queue.LifoQueue(maxsize=SMTP_POOL_MAX)
+        atexit.register(self.close_smtp_pool)
+
+        # Emails are delivered off the caller's thread; one worker per pooled connection
+        self._email_executor = ThreadPoolExecutor(
+            max_workers=SMTP_POOL_MAX, thread_name_prefix="alert-email"
+        )
+
+        # Rules by ID for send_alert's schedule/cooldown gating (see _get_rule_cached)
+        self._rule_cache: Dict[str, _CachedRule] = {}
+
+        # dedupe key -> (window expiry, history row the window collapses into)
+        self._dedupe_windows: Dict[str, Tuple[float, str]] = {}
+
+        # Both caches above are per process: with several uvicorn workers each
+        # worker gates and collapses only the alerts it handles itself. The
+        # cooldown is persisted (AlertRule.last_triggered_at, re-read every
+        # RULE_CACHE_TTL_SECONDS); dedupe windows are not.
+
+        # Guards the dicts above and _rule_locks; a rule's own lock is held from
+        # the schedule/cooldown/dedupe checks until its alerts are committed
+        self._lock = threading.Lock()
+        self._rule_locks: Dict[str, threading.Lock] = {}
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Yield a pooled DB session, rolling back on error and always closing it"""
+        session = db_service._get_session()
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _validate_sampling(threshold_config: Dict[str, Any]) -> None:
+        """Validate the optional dedupe settings in threshold_config"""
+        sampling = threshold_config.get('sampling', DEDUPE_DEFAULT_SAMPLING)
+        if sampling not in DEDUPE_SAMPLING_MODES:
+            raise ValueError(f"Invalid sampling '{sampling}'. Valid: {list(DEDUPE_SAMPLING_MODES)}")
+
+        cache_minutes = threshold_config.get('cache_minutes', DEDUPE_DEFAULT_CACHE_MINUTES)
+        if not isinstance(cache_minutes, (int, float)) or cache_minutes < 0:
+            raise ValueError(f"Invalid cache_minutes '{cache_minutes}'. Must be a non-negative number")
+
+    @staticmethod
+    def _dedupe_key(rule_id: str, anomaly: Dict[str, Any]) -> str:
+        """
+        Identify repeats of the same anomaly for a rule.
+
+        Built from what the anomaly is about (type, table or pipeline, column,
+        severity), not its message, which carries the live counts.
+        """
+        raw = (
+            f"{rule_id}:{anomaly.get('type')}:{anomaly.get('table') or anomaly.get('pipeline_id')}:"
+            f"{anomaly.get('column')}:{anomaly.get('severity')}"
+        )
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _alert_title(rule: _CachedRule, anomaly: Dict[str, Any]) -> str:
+        """Alert title / email subject for an anomaly"""
+        return f"[{rule.severity.upper()}] {anomaly.get('type', 'Anomaly')}: {anomaly.get('message', 'Alert triggered')}"
+
+    @staticmethod
+    def _schedule_skip_reason(rule: _CachedRule, now: datetime) -> Optional[str]:
+        """Day/hour/cooldown gating in one pass; returns why to skip, or None to send"""
+        if not (rule.days_mask >> now.weekday()) & 1:
+            return "not an enabled day"
+        if not (rule.hours_mask >> now.hour) & 1:
+            return "not an enabled hour"
+        if rule.last_triggered_at and (now - rule.last_triggered_at).total_seconds() < rule.cooldown_minutes * 60:
+            return "still in cooldown period"
+        return None
 
     def create_rule(
         self,
@@ -58,9 +284,6 @@ class AlertService:
         description: str = ""
     ) -> Dict[str, Any]:
         """Create a new alert rule"""
-        from app.db.models import AlertRule, Pipeline
-        from app.services.db_service import db_service
-
         # Validate rule_type
         valid_types = ['volume_spike', 'volume_drop', 'gap_detection', 'null_ratio']
         if rule_type not in valid_types:
@@ -71,12 +294,13 @@ class AlertService:
         if severity not in valid_severities:
             raise ValueError(f"Invalid severity '{severity}'. Valid: {valid_severities}")
 
+        self._validate_sampling(threshold_config)
+
         # Default to Friday only
         if enabled_days is None:
             enabled_days = [4]
 
-        session = db_service._get_session()
-        try:
+        with self._session() as session:
             # Verify pipeline exists if specified
             if pipeline_id:
                 pipeline = session.query(Pipeline).filter(
@@ -105,27 +329,19 @@ class AlertService:
             session.commit()
             session.refresh(rule)
 
-            print(f"[ALERT_SERVICE] Created alert rule '{name}' (type={rule_type}, days={enabled_days})")
+            logger.info("[ALERT_SERVICE] Created alert rule '%s' (type=%s, days=%s)", name, rule_type, enabled_days)
             return rule.to_dict()
 
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
-
     def list_rules(
         self,
         user_id: str,
         pipeline_id: Optional[str] = None,
-        active_only: bool = False
+        active_only: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """List alert rules for a user"""
-        from app.db.models import AlertRule
-        from app.services.db_service import db_service
-
-        session = db_service._get_session()
-        try:
+        """List alert rules for a user (newest first, optionally paginated)"""
+        with self._session() as session:
             query = session.query(AlertRule).filter(AlertRule.user_id == user_id)
 
             if pipeline_id:
@@ -134,26 +350,21 @@ class AlertService:
             if active_only:
                 query = query.filter(AlertRule.is_active == True)
 
-            rules = query.order_by(AlertRule.created_at.desc()).all()
-            return [rule.to_dict() for rule in rules]
+            query = query.order_by(AlertRule.created_at.desc()).offset(offset)
+            if limit is not None:
+                query = query.limit(limit)
 
-        finally:
-            session.close()
+            # Stream ORM rows in batches instead of materializing them all first
+            return [rule.to_dict() for rule in query.yield_per(100)]
 
     def get_rule(self, rule_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific alert rule"""
-        from app.db.models import AlertRule
-        from app.services.db_service import db_service
-
-        session = db_service._get_session()
-        try:
+        with self._session() as session:
             rule = session.query(AlertRule).filter(
                 AlertRule.id == rule_id,
                 AlertRule.user_id == user_id
             ).first()
             return rule.to_dict() if rule else None
-        finally:
-            session.close()
 
     def update_rule(
         self,
@@ -162,11 +373,7 @@ class AlertService:
         updates: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Update an alert rule"""
-        from app.db.models import AlertRule
-        from app.services.db_service import db_service
-
-        session = db_service._get_session()
-        try:
+        with self._session() as session:
             rule = session.query(AlertRule).filter(
                 AlertRule.id == rule_id,
                 AlertRule.user_id == user_id
@@ -175,6 +382,9 @@ class AlertService:
             if not rule:
                 raise ValueError(f"Alert rule '{rule_id}' not found")
 
+            if 'threshold_config' in updates:
+                self._validate_sampling(updates['threshold_config'])
+
             # Apply updates
             allowed_fields = [
                 'name', 'description', 'threshold_config', 'enabled_days',
@@ -186,21 +396,13 @@ class AlertService:
 
             session.commit()
             session.refresh(rule)
+            with self._lock:
+                self._rule_cache.pop(rule_id, None)
             return rule.to_dict()
 
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
-
     def delete_rule(self, rule_id: str, user_id: str) -> bool:
         """Delete an alert rule"""
-        from app.db.models import AlertRule
-        from app.services.db_service import db_service
-
-        session = db_service._get_session()
-        try:
+        with self._session() as session:
             rule = session.query(AlertRule).filter(
                 AlertRule.id == rule_id,
                 AlertRule.user_id == user_id
@@ -211,14 +413,11 @@ class AlertService:
 
             session.delete(rule)
             session.commit()
+            with self._lock:
+                self._rule_cache.pop(rule_id, None)
+                self._rule_locks.pop(rule_id, None)
             return True
 
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
-
     def send_alert(
         self,
         rule_id: str,
@@ -226,7 +425,11 @@ class AlertService:
         bypass_schedule: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
-        Send an alert email and record in history.
+        Record an alert in history and queue its email.
+
+        The history row is committed with email_sent=False and the email is
+        delivered on a background worker (with retries), which then records
+        email_sent / email_error on the row. Callers never wait on SMTP.
 
         Args:
             rule_id: Alert rule ID
@@ -234,138 +437,213 @@ class AlertService:
             bypass_schedule: If True, ignore day/hour restrictions
 
         Returns:
-            AlertHistory dict if alert was sent, None if skipped
+            AlertHistory dict if alert was triggered, None if skipped
         """
-        from app.db.models import AlertRule, AlertHistory
-        from app.services.db_service import db_service
+        results = self.send_alerts_bulk(rule_id, [anomaly], bypass_schedule=bypass_schedule)
+        return results[0] if results else None
 
-        session = db_service._get_session()
-        try:
-            rule = session.query(AlertRule).filter(AlertRule.id == rule_id).first()
-            if not rule:
-                raise ValueError(f"Alert rule '{rule_id}' not found")
+    async def send_alert_async(
+        self,
+        rule_id: str,
+        anomaly: Dict[str, Any],
+        bypass_schedule: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        send_alert for async callers.
 
-            if not rule.is_active:
-                print(f"[ALERT_SERVICE] Skipping alert - rule '{rule.name}' is inactive")
-                return None
+        The DB work runs in a worker thread so the event loop never blocks on it;
+        the email itself is then delivered by the SMTP worker pool as usual.
+        """
+        return await asyncio.to_thread(self.send_alert, rule_id, anomaly, bypass_schedule)
 
-            # Check schedule unless bypassed
-            if not bypass_schedule:
-                if not self.is_alert_day(rule.enabled_days or []):
-                    print(f"[ALERT_SERVICE] Skipping alert - not an enabled day")
-                    return None
+    def send_alerts_bulk(
+        self,
+        rule_id: str,
+        anomalies: List[Dict[str, Any]],
+        bypass_schedule: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Record several alerts for one rule in a single transaction.
 
-                if not self.is_alert_hour(rule.enabled_hours):
-                    print(f"[ALERT_SERVICE] Skipping alert - not an enabled hour")
-                    return None
+        Schedule and cooldown are checked once for the batch; every anomaly that
+        passes dedupe becomes a history row, all committed together, and the
+        rule's trigger tracking is updated once.
 
-                if not self.check_cooldown(rule.last_triggered_at, rule.cooldown_minutes):
-                    print(f"[ALERT_SERVICE] Skipping alert - still in cooldown period")
-                    return None
+        Returns:
+            AlertHistory dicts for the alerts recorded (empty if skipped)
+        """
+        # Gating uses the cached rule, so skipped alerts never touch the DB
+        with self._rule_lock(rule_id):
+            rule = self._get_rule_cached(rule_id)
+            return self._send_alerts_with_rule(rule, anomalies, bypass_schedule)
+
+    def _rule_lock(self, rule_id: str) -> threading.Lock:
+        """The lock serializing alert gating and recording for one rule"""
+        with self._lock:
+            return self._rule_locks.setdefault(rule_id, threading.Lock())
 
-            # Build email content
-            title = f"[{rule.severity.upper()}] {anomaly.get('type', 'Anomaly')}: {anomaly.get('message', 'Alert triggered')}"
-            message = self._build_email_body(rule, anomaly)
-            recipients = rule.recipients or []
+    def _send_alerts_with_rule(
+        self,
+        rule: _CachedRule,
+        anomalies: List[Dict[str, Any]],
+        bypass_schedule: bool
+    ) -> List[Dict[str, Any]]:
+        """send_alerts_bulk for a rule snapshot the caller already holds (under its _rule_lock)"""
+        rule_id = rule.id
+
+        if not rule.is_active:
+            logger.info("[ALERT_SERVICE] Skipping alert - rule '%s' is inactive", rule.name)
+            return []
+
+        # Nobody to notify: skip scheduling, rendering and the history write (test alerts still go through)
+        if not rule.recipients and not bypass_schedule:
+            logger.info("[ALERT_SERVICE] Skipping alert - rule '%s' has no recipients", rule.name)
+            return []
+
+        # Check schedule unless bypassed
+        if not bypass_schedule:
+            skip_reason = self._schedule_skip_reason(rule, datetime.utcnow())
+            if skip_reason:
+                logger.info("[ALERT_SERVICE] Skipping alert - %s", skip_reason)
+                return []
+
+        # Collapse repeats of the same anomaly into the alert already recorded
+        sampling = rule.threshold_config.get('sampling', DEDUPE_DEFAULT_SAMPLING)
+        cache_minutes = rule.threshold_config.get('cache_minutes', DEDUPE_DEFAULT_CACHE_MINUTES)
+        dedupe = not bypass_schedule and sampling != 'disabled' and cache_minutes > 0
+
+        recipients = rule.recipients
+        triggered_at = datetime.utcnow()
+        histories: Dict[str, AlertHistory] = {}
+        for anomaly in anomalies:
+            dedupe_key = None
+            if dedupe:
+                dedupe_key = self._dedupe_key(rule_id, anomaly)
+                with self._lock:
+                    window = self._dedupe_windows.get(dedupe_key)
+                if window is not None and time.monotonic() < window[0]:
+                    logger.info("[ALERT_SERVICE] Skipping alert - duplicate anomaly (skip_reason=dedupe, sampling=%s)", sampling)
+                    self._record_duplicate(window[1], rule, anomaly, sampling)
+                    continue
+
+                history = histories.get(dedupe_key)
+                if history is not None:
+                    # Duplicate within this batch: fold into the pending row
+                    history.occurrence_count += 1
+                    if sampling == 'last':
+                        history.title = self._alert_title(rule, anomaly)
+                        history.message = self._build_email_body(rule, anomaly)
+                        history.details = anomaly.get('details')
+                    continue
 
-            # Create history record
             history = AlertHistory(
-                id=str(uuid.uuid4()),
+                id=str(uuid7()),
                 rule_id=rule_id,
                 alert_type=anomaly.get('type', rule.rule_type),
                 severity=rule.severity,
-                title=title,
-                message=message,
+                title=self._alert_title(rule, anomaly),
+                message=self._build_email_body(rule, anomaly),
                 details=anomaly.get('details'),
-                email_recipients=recipients
+                email_sent=False,
+                email_recipients=recipients,
+                occurrence_count=1,
+                triggered_at=triggered_at
+            )
+            histories[dedupe_key if dedupe_key is not None else history.id] = history
+
+        if not histories:
+            return []
+
+        with self._session() as session:
+            # Update rule trigger tracking in one atomic statement (and the cached copy's cooldown)
+            updated = session.execute(
+                update(AlertRule)
+                .where(AlertRule.id == rule_id)
+                .values(
+                    last_triggered_at=triggered_at,
+                    trigger_count=func.coalesce(AlertRule.trigger_count, 0) + len(histories)
+                )
             )
+            if updated.rowcount == 0:
+                with self._lock:
+                    self._rule_cache.pop(rule_id, None)
+                raise ValueError(f"Alert rule '{rule_id}' not found")
 
-            # Send email
-            email_error = None
-            if recipients:
-                try:
-                    self._send_email(recipients, title, message)
-                    history.email_sent = True
-                    history.email_sent_at = datetime.utcnow()
-                    print(f"[ALERT_SERVICE] Email sent to {recipients}")
-                except Exception as e:
-                    email_error = str(e)
-                    history.email_error = email_error
-                    print(f"[ALERT_SERVICE] Email failed: {email_error}")
-
-            # Update rule trigger tracking
-            rule.last_triggered_at = datetime.utcnow()
-            rule.trigger_count = (rule.trigger_count or 0) + 1
-
-            session.add(history)
+            session.add_all(histories.values())
+
+            # Every column is set explicitly, so serialize before commit expires them
+            session.flush()
+            results = [history.to_dict() for history in histories.values()]
             session.commit()
-            session.refresh(history)
+        rule.last_triggered_at = triggered_at
 
-            return history.to_dict()
+        if dedupe:
+            for key, result in zip(histories, results):
+                self._open_dedupe_window(key, result['id'], cache_minutes)
 
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        # Deliver the emails in the background (one SMTP connection) once the rows exist
+        if recipients:
+            self._email_executor.submit(self._deliver_emails, [
+                (result['id'], recipients, result['title'], result['message'])
+                for result in results
+            ])
+
+        return results
 
     def send_test_alert(self, rule_id: str, user_id: str) -> Dict[str, Any]:
         """Send a test alert regardless of schedule"""
-        from app.db.models import AlertRule
-        from app.services.db_service import db_service
-
-        session = db_service._get_session()
-        try:
-            rule = session.query(AlertRule).filter(
+        with self._session() as session:
+            db_rule = session.query(AlertRule).filter(
                 AlertRule.id == rule_id,
                 AlertRule.user_id == user_id
             ).first()
 
-            if not rule:
+            if not db_rule:
                 raise ValueError(f"Alert rule '{rule_id}' not found")
 
-            # Create test anomaly
-            test_anomaly = {
-                'type': rule.rule_type,
-                'severity': rule.severity,
-                'message': f'Test alert for rule "{rule.name}"',
-                'details': {
-                    'test': True,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'threshold_config': rule.threshold_config
-                }
+            rule = _CachedRule.from_model(db_rule, time.monotonic())
+
+        # Send with the rule just loaded (and let send_alert reuse the fresh snapshot)
+        with self._lock:
+            self._rule_cache[rule_id] = rule
+
+        # Create test anomaly
+        test_anomaly = {
+            'type': rule.rule_type,
+            'severity': rule.severity,
+            'message': f'Test alert for rule "{rule.name}"',
+            'details': {
+                'test': True,
+                'timestamp': datetime.utcnow().isoformat(),
+                'threshold_config': rule.threshold_config
             }
+        }
 
-            result = self.send_alert(rule_id, test_anomaly, bypass_schedule=True)
-
-            if result:
-                return {
-                    'status': 'success',
-                    'message': f'Test alert sent for rule "{rule.name}"',
-                    'alert_history_id': result['id'],
-                    'recipients': rule.recipients or []
-                }
-            else:
-                return {
-                    'status': 'error',
-                    'message': 'Failed to send test alert'
-                }
+        with self._rule_lock(rule_id):
+            results = self._send_alerts_with_rule(rule, [test_anomaly], bypass_schedule=True)
 
-        finally:
-            session.close()
+        if results:
+            return {
+                'status': 'success',
+                'message': f'Test alert sent for rule "{rule.name}"',
+                'alert_history_id': results[0]['id'],
+                'recipients': rule.recipients
+            }
+        else:
+            return {
+                'status': 'error',
+                'message': 'Failed to send test alert'
+            }
 
     def get_history(
         self,
         user_id: str,
         rule_id: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """Get alert history"""
-        from app.db.models import AlertRule, AlertHistory
-        from app.services.db_service import db_service
-
-        session = db_service._get_session()
-        try:
+        """Get alert history (newest first)"""
+        with self._session() as session:
             query = session.query(AlertHistory).join(AlertRule).filter(
                 AlertRule.user_id == user_id
             )
@@ -373,64 +651,262 @@ class AlertService:
             if rule_id:
                 query = query.filter(AlertHistory.rule_id == rule_id)
 
-            history = query.order_by(AlertHistory.triggered_at.desc()).limit(limit).all()
-            return [h.to_dict() for h in history]
+            # (rule_id, triggered_at) index serves the ordered scan when filtering by rule
+            query = query.order_by(AlertHistory.triggered_at.desc()).offset(offset).limit(limit)
+            return [h.to_dict() for h in query.yield_per(100)]
+
+    def _open_dedupe_window(self, dedupe_key: str, history_id: str, cache_minutes: float) -> None:
+        """Start collapsing repeats of an anomaly into history_id"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._dedupe_windows) >= DEDUPE_PRUNE_THRESHOLD:
+                expired = [key for key, (expires_at, _) in self._dedupe_windows.items() if expires_at <= now]
+                for key in expired:
+                    self._dedupe_windows.pop(key, None)
+            self._dedupe_windows[dedupe_key] = (now + cache_minutes * 60, history_id)
+
+    def _record_duplicate(
+        self,
+        history_id: str,
+        rule: _CachedRule,
+        anomaly: Dict[str, Any],
+        sampling: str
+    ) -> None:
+        """Count a collapsed anomaly on its history row (and keep the latest for sampling='last')"""
+        values: Dict[str, Any] = {'occurrence_count': AlertHistory.occurrence_count + 1}
+        if sampling == 'last':
+            values['title'] = self._alert_title(rule, anomaly)
+            values['message'] = self._build_email_body(rule, anomaly)
+            values['details'] = anomaly.get('details')
 
-        finally:
-            session.close()
+        try:
+            with self._session() as session:
+                session.query(AlertHistory).filter(
+                    AlertHistory.id == history_id
+                ).update(values, synchronize_session=False)
+                session.commit()
+        except Exception as e:
+            logger.error("[ALERT_SERVICE] Failed to record duplicate alert %s: %s", history_id, e)
+
+    def _get_rule_cached(self, rule_id: str) -> _CachedRule:
+        """
+        Get a rule's alerting fields, re-reading from the DB at most once per TTL.
+
+        update_rule / delete_rule invalidate the entry; send_alert keeps its
+        last_triggered_at current, so cooldown checks stay accurate in-process.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._rule_cache.get(rule_id)
+        if cached is not None and now - cached.cached_at < RULE_CACHE_TTL_SECONDS:
+            return cached
+
+        with self._session() as session:
+            rule = session.query(AlertRule).filter(AlertRule.id == rule_id).first()
+            if not rule:
+                with self._lock:
+                    self._rule_cache.pop(rule_id, None)
+                raise ValueError(f"Alert rule '{rule_id}' not found")
+            cached = _CachedRule.from_model(rule, now)
+
+        with self._lock:
+            self._rule_cache[rule_id] = cached
+        return cached
+
+    def _deliver_emails(self, jobs: List[Tuple[str, List[str], str, str]]):
+        """
+        Send alert emails with retries, then record each outcome on its history row.
+
+        Args:
+            jobs: (history_id, recipients, subject, html_body) per alert
+        """
+        email_errors: Dict[str, Optional[str]] = {}
+        pending = jobs
+        for attempt in range(EMAIL_MAX_RETRIES + 1):
+            errors = self._send_email_many([job[1:] for job in pending])
+
+            retry = []
+            for job, error in zip(pending, errors):
+                history_id, recipients = job[0], job[1]
+                if error is None:
+                    email_errors[history_id] = None
+                    logger.info("[ALERT_SERVICE] Email sent to %s", recipients)
+                elif attempt < EMAIL_MAX_RETRIES and self._is_transient_email_error(error):
+                    retry.append(job)
+                else:
+                    email_errors[history_id] = str(error)
+                    logger.warning("[ALERT_SERVICE] Email failed: %s", error)
+
+            if not retry:
+                break
+            time.sleep(2 ** attempt)
+            pending = retry
+
+        sent_ids = [history_id for history_id, error in email_errors.items() if error is None]
+        try:
+            with self._session() as session:
+                if sent_ids:
+                    session.query(AlertHistory).filter(AlertHistory.id.in_(sent_ids)).update(
+                        {'email_sent': True, 'email_sent_at': datetime.utcnow()},
+                        synchronize_session=False
+                    )
+                for history_id, error in email_errors.items():
+                    if error is not None:
+                        session.query(AlertHistory).filter(AlertHistory.id == history_id).update(
+                            {'email_error': error}, synchronize_session=False
+                        )
+                session.commit()
+        except Exception as e:
+            logger.error("[ALERT_SERVICE] Failed to record email status for %s: %s", list(email_errors), e)
+
+    @staticmethod
+    def _is_transient_email_error(error: Exception) -> bool:
+        """
+        Whether a failed send is worth retrying.
+
+        Dropped connections, timeouts and 4xx replies are retried; refused
+        recipients / sender, auth failures and 5xx replies are permanent.
+        (Every SMTPException is an OSError, so the type alone doesn't tell.)
+        """
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        return isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout))
 
     def _build_email_body(self, rule, anomaly: Dict[str, Any]) -> str:
         """Build HTML email body"""
-        details = anomaly.get('details', {})
-        details_html = ""
-        if details:
-            details_html = "<h3>Details</h3><ul>"
-            for key, value in details.items():
-                details_html += f"<li><strong>{key}:</strong> {value}</li>"
-            details_html += "</ul>"
-
-        return f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background: #f8f9fa; padding: 20px; border-radius: 8px;">
-                <h2 style="color: #dc3545; margin-top: 0;">
-                    DataFlow Alert: {anomaly.get('type', 'Anomaly Detected')}
-                </h2>
-
-                <div style="background: white; padding: 15px; border-radius: 4px; margin: 15px 0;">
-                    <p><strong>Rule:</strong> {rule.name}</p>
-                    <p><strong>Type:</strong> {rule.rule_type}</p>
-                    <p><strong>Severity:</strong> <span style="color: {'#dc3545' if rule.severity == 'critical' else '#ffc107' if rule.severity == 'warning' else '#17a2b8'};">{rule.severity.upper()}</span></p>
-                    <p><strong>Message:</strong> {anomaly.get('message', 'N/A')}</p>
-                </div>
+        return EMAIL_BODY_TEMPLATE.render(
+            rule=rule,
+            anomaly=anomaly,
+            details=anomaly.get('details') or {},
+            severity_color=SEVERITY_COLORS.get(rule.severity, SEVERITY_COLORS['info']),
+            sent_at=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+        )
+
+    def _send_email_many(self, jobs: List[Tuple[List[str], str, str]]) -> List[Optional[Exception]]:
+        """
+        Send several emails over one pooled SMTP connection.
 
-                {details_html}
+        Each job is (recipients, subject, html_body) and gets its own envelope.
 
-                <p style="color: #6c757d; font-size: 12px; margin-top: 20px;">
-                    This alert was sent by DataFlow AI at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}
-                </p>
-            </div>
-        </body>
-        </html>
+        Returns:
+            The error for each job, or None if it was sent
         """
+        return self._sendmail_many([
+            (recipients, self._build_message(recipients, subject, html_body))
+            for recipients, subject, html_body in jobs
+        ])
 
-    def _send_email(self, recipients: List[str], subject: str, html_body: str):
-        """Send email via SMTP"""
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = self.from_email
-        msg['To'] = ', '.join(recipients)
+    def _build_message(self, recipients: List[str], subject: str, html_body: str) -> str:
+        """
+        Serialize the multipart (plain + HTML) alert email.
 
+        Fills the prebuilt layout directly instead of assembling MIME objects;
+        Header handles folding and RFC 2047 encoding of non-ASCII subjects.
+        """
         # Plain text version
         text_body = f"DataFlow Alert\n\n{subject}\n\nView the DataFlow dashboard for details."
-        msg.attach(MIMEText(text_body, 'plain'))
-        msg.attach(MIMEText(html_body, 'html'))
+        return self._message_template.format(
+            subject=Header(subject, header_name='Subject').encode(),
+            to=Header(', '.join(recipients), header_name='To').encode(),
+            text_body=base64.encodebytes(text_body.encode()).decode('ascii'),
+            html_body=base64.encodebytes(html_body.encode()).decode('ascii')
+        )
+
+    def _sendmail_many(self, envelopes: List[Tuple[List[str], str]]) -> List[Optional[Exception]]:
+        """
+        Send pre-serialized messages, one (recipients, payload) envelope each,
+        over one pooled connection. A failed send drops the connection and the
+        next envelope opens a fresh one.
+        """
+        errors: List[Optional[Exception]] = []
+        conn = None
+        for recipients, payload in envelopes:
+            try:
+                if conn is None:
+                    conn = self._acquire_smtp()
+                conn.server.sendmail(self.from_email, recipients, payload)
+            except Exception as e:
+                if conn is not None:
+                    self._close_smtp(conn)
+                    conn = None
+                errors.append(e)
+                continue
+            conn.messages_sent += 1
+            errors.append(None)
+
+        if conn is not None:
+            self._release_smtp(conn)
+        return errors
+
+    def _acquire_smtp(self) -> _PooledSMTP:
+        """Get a live pooled SMTP connection, or open a new one"""
+        while True:
+            try:
+                conn = self._smtp_pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                # Idle connections may have been dropped by the server
+                if conn.server.noop()[0] == 250:
+                    return conn
+            except OSError:  # includes SMTPException
+                pass
+            self._close_smtp(conn)
 
-        # Connect and send
-        with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-            if self.smtp_use_tls:
+        try:
+            server = _ResolvedSMTP(self.smtp_host, self._smtp_address(), self.smtp_port, SMTP_TIMEOUT_SECONDS)
+        except OSError:
+            # The host may have moved (e.g. container restart); re-resolve next time
+            self._smtp_addr = None
+            raise
+        if self.smtp_use_tls:
+            try:
                 server.starttls()
-            server.sendmail(self.from_email, recipients, msg.as_string())
+            except BaseException:
+                server.close()
+                raise
+        return _PooledSMTP(server)
+
+    def _smtp_address(self) -> str:
+        """SMTP host as an IP address, resolved at most once per SMTP_DNS_TTL_SECONDS"""
+        cached = self._smtp_addr
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < SMTP_DNS_TTL_SECONDS:
+            return cached[0]
+
+        try:
+            ipaddress.ip_address(self.smtp_host)
+            address = self.smtp_host
+        except ValueError:
+            address = socket.getaddrinfo(self.smtp_host, self.smtp_port, type=socket.SOCK_STREAM)[0][4][0]
+        self._smtp_addr = (address, now)
+        return address
+
+    def _release_smtp(self, conn: _PooledSMTP):
+        """Return a connection to the pool (or close it once it's used up / pool is full)"""
+        if conn.messages_sent >= SMTP_POOL_MSGS_PER_CONN:
+            self._close_smtp(conn)
+            return
+        try:
+            self._smtp_pool.put_nowait(conn)
+        except queue.Full:
+            self._close_smtp(conn)
+
+    @staticmethod
+    def _close_smtp(conn: _PooledSMTP):
+        """Politely QUIT, falling back to just closing the socket"""
+        try:
+            conn.server.quit()
+        except OSError:  # includes SMTPException
+            conn.server.close()
+
+    def close_smtp_pool(self):
+        """Close all idle pooled SMTP connections"""
+        while True:
+            try:
+                self._close_smtp(self._smtp_pool.get_nowait())
+            except queue.Empty:
+                return
 
 
 # Singleton instance
@@ -4,13 +4,136 @@ Detects anomalies in transformed data by comparing with original data.
 Includes volume-based and gap detection for pipeline health monitoring.
 """
 
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Severity levels
+SEVERITY_INFO = 'info'
+SEVERITY_WARNING = 'warning'
+SEVERITY_ERROR = 'error'
+SEVERITY_CRITICAL = 'critical'
+
+# Anomaly types
+ANOMALY_NULL_RATIO = 'null_ratio'
+ANOMALY_CARDINALITY = 'cardinality'
+ANOMALY_ROW_COUNT_DROP = 'row_count_drop'
+ANOMALY_TYPE_COERCION = 'type_coercion'
+ANOMALY_VOLUME_SPIKE = 'volume_spike'
+ANOMALY_VOLUME_DROP = 'volume_drop'
+ANOMALY_GAP = 'gap_detection'
+ANOMALY_MISSING_ENTITY_EVENTS = 'missing_entity_events'
+
+# Decimal places kept for float details when an anomaly is serialized.
+# Detectors store full precision; rounding is a presentation concern.
+DETAIL_PRECISION = {
+    'null_ratio': 4,
+    'cardinality_ratio': 2,
+    'drop_ratio': 4,
+    'ratio': 4,
+    'drop_percent': 1,
+    'multiplier': 2,
+    'baseline_count': 1,
+    'baseline_std': 2,
+    'z_score': 2,
+    'gap_minutes': 2,
+    'gap_seconds': 0,
+}
+
+
+class _LazyMessage:
+    """printf-style message formatted only when str() is taken"""
+
+    __slots__ = ('fmt', 'args')
+
+    def __init__(self, fmt: str, *args: Any):
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.fmt % self.args
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+
+@dataclass(slots=True)
+class Anomaly:
+    """
+    A detected anomaly.
+
+    Detectors emit these slotted records; the JSON-shaped dict is only built
+    with to_dict() where the result leaves the detector (API responses, alerts).
+    """
+
+    type: str
+    severity: str
+    message: Union[str, _LazyMessage]
+    details: Dict[str, Any]
+    column: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        details = {
+            key: round(value, DETAIL_PRECISION[key])
+            if key in DETAIL_PRECISION and value is not None else value
+            for key, value in self.details.items()
+        }
+
+        return {
+            'type': self.type,
+            'severity': self.severity,
+            'column': self.column,
+            'message': str(self.message),
+            'details': details
+        }
+
+
+# A compiled template detector: check(metrics, now, now_iso) -> anomaly or None
+TemplateCheck = Callable[[Dict[str, Any], datetime, Optional[str]], Optional[Anomaly]]
+
+# Template config sections that compile into checks
+TEMPLATE_SECTIONS = ('volume_spike', 'volume_drop', 'gap_detection')
+
+
+class RollingBaseline:
+    """
+    Streaming mean/variance of event counts (Welford's algorithm).
+
+    Each update is O(1) and the state is three numbers no matter how long
+    the stream runs, so callers no longer keep and re-average a history list.
+    """
+
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: float) -> None:
+        """Fold one observation into the running mean and variance"""
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def std(self) -> float:
+        """Population standard deviation of the observations so far"""
+        return (self.m2 / self.n) ** 0.5 if self.n else 0.0
 
 
 class AnomalyDetectorService:
     """Detect data anomalies in transformations."""
 
+    def __init__(self):
+        # One template usually drives many entities; reuse its compiled checks
+        self._compile_template_cached = lru_cache(maxsize=128)(self._compile_template_key)
+
     def analyze(
         self,
         original_data: Dict[str, Any],
@@ -41,12 +164,9 @@ class AnomalyDetectorService:
         # Merge with provided config
         thresholds = {**default_config, **(config or {})}
 
-        anomalies = []
-        summary = {
-            'errors': 0,
-            'warnings': 0,
-            'info': 0
-        }
+        anomalies: List[Anomaly] = []
+        # Severity counts live in locals until the summary is built at the end
+        errors = warnings = info = 0
 
         # Extract row counts
         original_rows = original_data.get('row_count', 0)
@@ -55,111 +175,129 @@ class AnomalyDetectorService:
         transformed_stats = transformed_data.get('stats', {})
 
         # 1. NULL RATIO CHECK
+        # One pass computes every ratio but keeps only columns over the lower
+        # threshold; anomaly dicts are built for those columns alone
         null_counts = transformed_stats.get('null_counts', {})
-        for col_name, null_count in null_counts.items():
-            if transformed_rows > 0:
-                null_ratio = null_count / transformed_rows
-
-                if null_ratio > thresholds['null_ratio_error']:
-                    anomalies.append({
-                        'type': 'null_ratio',
-                        'severity': 'error',
-                        'column': col_name,
-                        'message': f"Column '{col_name}' has {null_ratio*100:.1f}% NULL values (threshold: {thresholds['null_ratio_error']*100:.1f}%)",
-                        'details': {
+        if transformed_rows > 0 and null_counts:
+            error_threshold = thresholds['null_ratio_error']
+            warning_threshold = thresholds['null_ratio_warning']
+            flag_threshold = min(warning_threshold, error_threshold)
+            flagged_columns = [
+                (col_name, null_count, null_ratio)
+                for col_name, null_count in null_counts.items()
+                if (null_ratio := null_count / transformed_rows) > flag_threshold
+            ]
+
+            for col_name, null_count, null_ratio in flagged_columns:
+                if null_ratio > error_threshold:
+                    anomalies.append(Anomaly(
+                        type=ANOMALY_NULL_RATIO,
+                        severity=SEVERITY_ERROR,
+                        column=col_name,
+                        message=_LazyMessage("Column '%s' has %.1f%% NULL values (threshold: %.1f%%)", col_name, null_ratio*100, error_threshold*100),
+                        details={
                             'null_count': null_count,
                             'total_rows': transformed_rows,
-                            'null_ratio': round(null_ratio, 4)
+                            'null_ratio': null_ratio
                         }
-                    })
-                    summary['errors'] += 1
-
-                elif null_ratio > thresholds['null_ratio_warning']:
-                    anomalies.append({
-                        'type': 'null_ratio',
-                        'severity': 'warning',
-                        'column': col_name,
-                        'message': f"Column '{col_name}' has {null_ratio*100:.1f}% NULL values (threshold: {thresholds['null_ratio_warning']*100:.1f}%)",
-                        'details': {
+                    ))
+                    errors += 1
+
+                elif null_ratio > warning_threshold:
+                    anomalies.append(Anomaly(
+                        type=ANOMALY_NULL_RATIO,
+                        severity=SEVERITY_WARNING,
+                        column=col_name,
+                        message=_LazyMessage("Column '%s' has %.1f%% NULL values (threshold: %.1f%%)", col_name, null_ratio*100, warning_threshold*100),
+                        details={
                             'null_count': null_count,
                             'total_rows': transformed_rows,
-                            'null_ratio': round(null_ratio, 4)
+                            'null_ratio': null_ratio
                         }
-                    })
-                    summary['warnings'] += 1
-
-        # 2. CARDINALITY CHECK (for joins)
-        if transformation_type == 'join' and original_rows > 0:
-            cardinality_ratio = transformed_rows / original_rows
-
-            if cardinality_ratio > thresholds['cardinality_multiplier']:
-                anomalies.append({
-                    'type': 'cardinality',
-                    'severity': 'warning',
-                    'column': None,
-                    'message': f"JOIN produced {cardinality_ratio:.2f}x more rows than original (threshold: {thresholds['cardinality_multiplier']}x). Possible cartesian product.",
-                    'details': {
-                        'original_rows': original_rows,
-                        'output_rows': transformed_rows,
-                        'cardinality_ratio': round(cardinality_ratio, 2)
-                    }
-                })
-                summary['warnings'] += 1
-
-        # 3. ROW COUNT DROP CHECK (for filters)
-        if transformation_type == 'filter' and original_rows > 0:
-            row_drop_ratio = 1 - (transformed_rows / original_rows)
-
-            if row_drop_ratio > thresholds['row_count_drop_warning']:
-                anomalies.append({
-                    'type': 'row_count_drop',
-                    'severity': 'info',
-                    'column': None,
-                    'message': f"FILTER reduced rows by {row_drop_ratio*100:.1f}% ({original_rows} → {transformed_rows}). Verify filter condition is correct.",
-                    'details': {
-                        'original_rows': original_rows,
-                        'output_rows': transformed_rows,
-                        'drop_ratio': round(row_drop_ratio, 4)
-                    }
-                })
-                summary['info'] += 1
+                    ))
+                    warnings += 1
+
+        # 2-3. Transformation-specific checks (both read the output/input row ratio)
+        row_ratio = transformed_rows / original_rows if original_rows > 0 else None
+
+        match transformation_type:
+            # 2. CARDINALITY CHECK (for joins)
+            case 'join' if row_ratio is not None:
+                cardinality_ratio = row_ratio
+
+                if cardinality_ratio > thresholds['cardinality_multiplier']:
+                    anomalies.append(Anomaly(
+                        type=ANOMALY_CARDINALITY,
+                        severity=SEVERITY_WARNING,
+                        column=None,
+                        message=_LazyMessage("JOIN produced %.2fx more rows than original (threshold: %sx). Possible cartesian product.", cardinality_ratio, thresholds['cardinality_multiplier']),
+                        details={
+                            'original_rows': original_rows,
+                            'output_rows': transformed_rows,
+                            'cardinality_ratio': cardinality_ratio
+                        }
+                    ))
+                    warnings += 1
+
+            # 3. ROW COUNT DROP CHECK (for filters)
+            case 'filter' if row_ratio is not None:
+                row_drop_ratio = 1 - row_ratio
+
+                if row_drop_ratio > thresholds['row_count_drop_warning']:
+                    anomalies.append(Anomaly(
+                        type=ANOMALY_ROW_COUNT_DROP,
+                        severity=SEVERITY_INFO,
+                        column=None,
+                        message=_LazyMessage("FILTER reduced rows by %.1f%% (%s → %s). Verify filter condition is correct.", row_drop_ratio*100, original_rows, transformed_rows),
+                        details={
+                            'original_rows': original_rows,
+                            'output_rows': transformed_rows,
+                            'drop_ratio': row_drop_ratio
+                        }
+                    ))
+                    info += 1
 
         # 4. TYPE COERCION CHECK
         # Compare column types if original data has column metadata
+        # (aggregations change types by design, so they are not checked)
         original_columns = original_data.get('columns', [])
-        if original_columns:
-            original_col_map = {col['name']: col for col in original_columns}
+        if original_columns and transformation_type != 'aggregation':
+            original_types = {col['name']: col.get('type', '') for col in original_columns}
 
             for transformed_col in transformed_columns:
                 col_name = transformed_col['name']
                 transformed_type = transformed_col.get('type', '')
+                original_type = original_types.get(col_name)
+
+                if original_type and transformed_type and original_type != transformed_type:
+                    anomalies.append(Anomaly(
+                        type=ANOMALY_TYPE_COERCION,
+                        severity=SEVERITY_INFO,
+                        column=col_name,
+                        message=_LazyMessage("Column '%s' type changed from %s to %s", col_name, original_type, transformed_type),
+                        details={
+                            'original_type': original_type,
+                            'transformed_type': transformed_type
+                        }
+                    ))
+                    info += 1
 
-                if col_name in original_col_map:
-                    original_type = original_col_map[col_name].get('type', '')
-
-                    # Check if type changed (excluding expected aggregations)
-                    if original_type and transformed_type and original_type != transformed_type:
-                        # Skip if this is an aggregation (expected type change)
-                        if transformation_type != 'aggregation':
-                            anomalies.append({
-                                'type': 'type_coercion',
-                                'severity': 'info',
-                                'column': col_name,
-                                'message': f"Column '{col_name}' type changed from {original_type} to {transformed_type}",
-                                'details': {
-                                    'original_type': original_type,
-                                    'transformed_type': transformed_type
-                                }
-                            })
-                            summary['info'] += 1
+        summary = {
+            'errors': errors,
+            'warnings': warnings,
+            'info': info
+        }
 
         # Determine if pipeline can proceed
-        can_proceed = summary['errors'] == 0
+        can_proceed = errors == 0
 
-        print(f"[ANOMALY_DETECTOR] Analyzed {transformation_type}: {summary['errors']} errors, {summary['warnings']} warnings, {summary['info']} info")
+        logger.debug(
+            "[ANOMALY_DETECTOR] Analyzed %s: %d errors, %d warnings, %d info",
+            transformation_type, errors, warnings, info
+        )
 
         return {
-            'anomalies': anomalies,
+            'anomalies': [anomaly.to_dict() for anomaly in anomalies],
             'summary': summary,
             'can_proceed': can_proceed,
             'transformation_type': transformation_type,
@@ -173,8 +311,10 @@ class AnomalyDetectorService:
         self,
         current_count: int,
         baseline_count: float,
-        threshold: float = 3.0
-    ) -> Optional[Dict[str, Any]]:
+        threshold: float = 3.0,
+        now: Optional[datetime] = None,
+        now_iso: Optional[str] = None
+    ) -> Optional[Anomaly]:
         """
         Detect if current volume exceeds threshold * baseline.
 
@@ -182,28 +322,30 @@ class AnomalyDetectorService:
             current_count: Current event count in the time window
             baseline_count: Average/expected event count (baseline)
             threshold: Multiplier threshold (default 3.0 = 3x normal)
+            now: Detection time (defaults to the current UTC time)
+            now_iso: now.isoformat(), when the caller already has it
 
         Returns:
-            Anomaly dict if spike detected, None otherwise
+            Anomaly if spike detected, None otherwise
         """
         if baseline_count <= 0:
             return None
 
         multiplier = current_count / baseline_count
         if multiplier > threshold:
-            anomaly = {
-                'type': 'volume_spike',
-                'severity': 'warning' if multiplier < threshold * 2 else 'critical',
-                'message': f'Volume spike detected: {current_count} events ({multiplier:.1f}x baseline of {baseline_count:.0f})',
-                'details': {
+            anomaly = Anomaly(
+                type=ANOMALY_VOLUME_SPIKE,
+                severity=SEVERITY_WARNING if multiplier < threshold * 2 else SEVERITY_CRITICAL,
+                message=_LazyMessage('Volume spike detected: %s events (%.1fx baseline of %.0f)', current_count, multiplier, baseline_count),
+                details={
                     'current_count': current_count,
-                    'baseline_count': round(baseline_count, 1),
-                    'multiplier': round(multiplier, 2),
+                    'baseline_count': baseline_count,
+                    'multiplier': multiplier,
                     'threshold': threshold,
-                    'detected_at': datetime.utcnow().isoformat()
+                    'detected_at': now_iso or (now or datetime.utcnow()).isoformat()
                 }
-            }
-            print(f"[ANOMALY_DETECTOR] Volume spike: {current_count} events ({multiplier:.1f}x baseline)")
+            )
+            logger.info("[ANOMALY_DETECTOR] Volume spike: %s events (%.1fx baseline)", current_count, multiplier)
             return anomaly
 
         return None
@@ -212,8 +354,10 @@ class AnomalyDetectorService:
         self,
         current_count: int,
         baseline_count: float,
-        threshold: float = 0.2
-    ) -> Optional[Dict[str, Any]]:
+        threshold: float = 0.2,
+        now: Optional[datetime] = None,
+        now_iso: Optional[str] = None
+    ) -> Optional[Anomaly]:
         """
         Detect if current volume dropped below threshold * baseline.
 
@@ -221,9 +365,11 @@ class AnomalyDetectorService:
             current_count: Current event count in the time window
             baseline_count: Average/expected event count (baseline)
             threshold: Ratio threshold (default 0.2 = 80% drop)
+            now: Detection time (defaults to the current UTC time)
+            now_iso: now.isoformat(), when the caller already has it
 
         Returns:
-            Anomaly dict if drop detected, None otherwise
+            Anomaly if drop detected, None otherwise
         """
         if baseline_count <= 0:
             return None
@@ -231,20 +377,75 @@ class AnomalyDetectorService:
         ratio = current_count / baseline_count
         if ratio < threshold:
             drop_percent = (1 - ratio) * 100
-            anomaly = {
-                'type': 'volume_drop',
-                'severity': 'warning' if ratio > threshold / 2 else 'critical',
-                'message': f'Volume drop detected: {current_count} events ({drop_percent:.0f}% drop from baseline of {baseline_count:.0f})',
-                'details': {
+            anomaly = Anomaly(
+                type=ANOMALY_VOLUME_DROP,
+                severity=SEVERITY_WARNING if ratio > threshold / 2 else SEVERITY_CRITICAL,
+                message=_LazyMessage('Volume drop detected: %s events (%.0f%% drop from baseline of %.0f)', current_count, drop_percent, baseline_count),
+                details={
                     'current_count': current_count,
-                    'baseline_count': round(baseline_count, 1),
-                    'ratio': round(ratio, 4),
-                    'drop_percent': round(drop_percent, 1),
+                    'baseline_count': baseline_count,
+                    'ratio': ratio,
+                    'drop_percent': drop_percent,
                     'threshold': threshold,
-                    'detected_at': datetime.utcnow().isoformat()
+                    'detected_at': now_iso or (now or datetime.utcnow()).isoformat()
                 }
-            }
-            print(f"[ANOMALY_DETECTOR] Volume drop: {current_count} events ({drop_percent:.0f}% drop)")
+            )
+            logger.info("[ANOMALY_DETECTOR] Volume drop: %s events (%.0f%% drop)", current_count, drop_percent)
+            return anomaly
+
+        return None
+
+    def detect_volume_deviation(
+        self,
+        current_count: int,
+        baseline: RollingBaseline,
+        z_threshold: float = 3.0,
+        min_samples: int = 3,
+        now: Optional[datetime] = None,
+        now_iso: Optional[str] = None
+    ) -> Optional[Anomaly]:
+        """
+        Detect a volume spike or drop as a z-score against a rolling baseline.
+
+        Scale-invariant alternative to the multiplier checks above: the same
+        z_threshold works for pipelines doing 10 or 10 million events.
+
+        Args:
+            current_count: Current event count in the time window
+            baseline: Rolling baseline of previous window counts (not yet
+                updated with current_count)
+            z_threshold: Standard deviations from the mean that trigger (default 3.0)
+            min_samples: Baseline observations required before alerting
+            now: Detection time (defaults to the current UTC time)
+            now_iso: now.isoformat(), when the caller already has it
+
+        Returns:
+            'volume_spike' or 'volume_drop' Anomaly, None otherwise
+        """
+        if baseline.n < min_samples:
+            return None
+
+        std = baseline.std()
+        if std <= 0:
+            return None
+
+        z_score = (current_count - baseline.mean) / std
+        if abs(z_score) > z_threshold:
+            direction = 'spike' if z_score > 0 else 'drop'
+            anomaly = Anomaly(
+                type=ANOMALY_VOLUME_SPIKE if z_score > 0 else ANOMALY_VOLUME_DROP,
+                severity=SEVERITY_WARNING if abs(z_score) < z_threshold * 2 else SEVERITY_CRITICAL,
+                message=_LazyMessage('Volume %s detected: %s events (%+.1fσ from baseline of %.0f)', direction, current_count, z_score, baseline.mean),
+                details={
+                    'current_count': current_count,
+                    'baseline_count': baseline.mean,
+                    'baseline_std': std,
+                    'z_score': z_score,
+                    'z_threshold': z_threshold,
+                    'detected_at': now_iso or (now or datetime.utcnow()).isoformat()
+                }
+            )
+            logger.info("[ANOMALY_DETECTOR] Volume %s: %s events (z=%+.1f)", direction, current_count, z_score)
             return anomaly
 
         return None
@@ -252,46 +453,85 @@ class AnomalyDetectorService:
     def detect_gap(
         self,
         last_event_time: datetime,
-        gap_threshold_minutes: int = 5
-    ) -> Optional[Dict[str, Any]]:
+        gap_threshold_minutes: int = 5,
+        now: Optional[datetime] = None,
+        now_iso: Optional[str] = None
+    ) -> Optional[Anomaly]:
         """
         Detect if no events for > threshold minutes.
 
         Args:
             last_event_time: Timestamp of the last event received
             gap_threshold_minutes: Minutes without events to trigger (default 5)
+            now: Detection time (defaults to the current UTC time)
+            now_iso: now.isoformat(), when the caller already has it
 
         Returns:
-            Anomaly dict if gap detected, None otherwise
+            Anomaly if gap detected, None otherwise
         """
-        gap_seconds = (datetime.utcnow() - last_event_time).total_seconds()
+        now = now or datetime.utcnow()
+        gap_seconds = (now - last_event_time).total_seconds()
         gap_minutes = gap_seconds / 60
 
         if gap_minutes >= gap_threshold_minutes:
-            anomaly = {
-                'type': 'gap_detection',
-                'severity': 'critical' if gap_minutes >= gap_threshold_minutes * 2 else 'warning',
-                'message': f'Event gap detected: no events for {gap_minutes:.1f} minutes (threshold: {gap_threshold_minutes} min)',
-                'details': {
-                    'gap_minutes': round(gap_minutes, 2),
-                    'gap_seconds': round(gap_seconds, 0),
+            anomaly = Anomaly(
+                type=ANOMALY_GAP,
+                severity=SEVERITY_CRITICAL if gap_minutes >= gap_threshold_minutes * 2 else SEVERITY_WARNING,
+                message=_LazyMessage('Event gap detected: no events for %.1f minutes (threshold: %s min)', gap_minutes, gap_threshold_minutes),
+                details={
+                    'gap_minutes': gap_minutes,
+                    'gap_seconds': gap_seconds,
                     'threshold_minutes': gap_threshold_minutes,
                     'last_event_time': last_event_time.isoformat(),
-                    'detected_at': datetime.utcnow().isoformat()
+                    'detected_at': now_iso or now.isoformat()
                 }
-            }
-            print(f"[ANOMALY_DETECTOR] Event gap: {gap_minutes:.1f} minutes since last event")
+            )
+            logger.info("[ANOMALY_DETECTOR] Event gap: %.1f minutes since last event", gap_minutes)
             return anomaly
 
         return None
 
+    def detect_gap_ts(
+        self,
+        last_event_ts: float,
+        gap_threshold_minutes: int = 5,
+        now_ts: Optional[float] = None
+    ) -> Optional[Anomaly]:
+        """
+        detect_gap for callers that track POSIX timestamps.
+
+        The common no-gap case is one clock read, a subtraction and a compare;
+        datetimes are only built once the gap is over the threshold.
+
+        Args:
+            last_event_ts: POSIX timestamp of the last event received
+            gap_threshold_minutes: Minutes without events to trigger (default 5)
+            now_ts: Detection time as a POSIX timestamp (defaults to time.time())
+
+        Returns:
+            Anomaly if gap detected, None otherwise
+        """
+        if now_ts is None:
+            now_ts = time.time()
+        if (now_ts - last_event_ts) / 60 < gap_threshold_minutes:
+            return None
+
+        # detect_gap works in naive UTC
+        return self.detect_gap(
+            datetime.fromtimestamp(last_event_ts, timezone.utc).replace(tzinfo=None),
+            gap_threshold_minutes,
+            now=datetime.fromtimestamp(now_ts, timezone.utc).replace(tzinfo=None)
+        )
+
     def detect_missing_entity_events(
         self,
         entity_id: str,
         entity_type: str,
         last_event_time: Optional[datetime],
-        expected_interval_minutes: int = 10
-    ) -> Optional[Dict[str, Any]]:
+        expected_interval_minutes: int = 10,
+        now: Optional[datetime] = None,
+        now_iso: Optional[str] = None
+    ) -> Optional[Anomaly]:
         """
         Detect if a specific entity (e.g., user) hasn't generated events.
 
@@ -300,40 +540,44 @@ class AnomalyDetectorService:
             entity_type: Type of entity ("user", "device", etc.)
             last_event_time: Last event time for this entity
             expected_interval_minutes: Expected max interval between events
+            now: Detection time (defaults to the current UTC time)
+            now_iso: now.isoformat(), when the caller already has it
 
         Returns:
-            Anomaly dict if missing events detected, None otherwise
+            Anomaly if missing events detected, None otherwise
         """
+        now = now or datetime.utcnow()
+
         if not last_event_time:
-            return {
-                'type': 'missing_entity_events',
-                'severity': 'info',
-                'message': f'No events found for {entity_type} {entity_id}',
-                'details': {
+            return Anomaly(
+                type=ANOMALY_MISSING_ENTITY_EVENTS,
+                severity=SEVERITY_INFO,
+                message=_LazyMessage('No events found for %s %s', entity_type, entity_id),
+                details={
                     'entity_id': entity_id,
                     'entity_type': entity_type,
                     'last_event_time': None,
-                    'detected_at': datetime.utcnow().isoformat()
+                    'detected_at': now_iso or now.isoformat()
                 }
-            }
+            )
 
-        gap_minutes = (datetime.utcnow() - last_event_time).total_seconds() / 60
+        gap_minutes = (now - last_event_time).total_seconds() / 60
 
         if gap_minutes >= expected_interval_minutes:
-            anomaly = {
-                'type': 'missing_entity_events',
-                'severity': 'warning',
-                'message': f'No events from {entity_type} {entity_id} for {gap_minutes:.1f} minutes',
-                'details': {
+            anomaly = Anomaly(
+                type=ANOMALY_MISSING_ENTITY_EVENTS,
+                severity=SEVERITY_WARNING,
+                message=_LazyMessage('No events from %s %s for %.1f minutes', entity_type, entity_id, gap_minutes),
+                details={
                     'entity_id': entity_id,
                     'entity_type': entity_type,
-                    'gap_minutes': round(gap_minutes, 2),
+                    'gap_minutes': gap_minutes,
                     'expected_interval_minutes': expected_interval_minutes,
                     'last_event_time': last_event_time.isoformat(),
-                    'detected_at': datetime.utcnow().isoformat()
+                    'detected_at': now_iso or now.isoformat()
                 }
-            }
-            print(f"[ANOMALY_DETECTOR] Missing events for {entity_type} {entity_id}: {gap_minutes:.1f} min")
+            )
+            logger.info("[ANOMALY_DETECTOR] Missing events for %s %s: %.1f min", entity_type, entity_id, gap_minutes)
             return anomaly
 
         return None
@@ -357,47 +601,145 @@ class AnomalyDetectorService:
                 - gap_detection: {enabled, minutes}
 
         Returns:
-            List of detected anomalies
+            List of detected anomalies (as dicts)
         """
-        anomalies = []
+        return [
+            anomaly.to_dict()
+            for anomaly in self.run_template_checks(metrics, self.compile_template(anomaly_config))
+        ]
+
+    def compile_template(self, anomaly_config: Dict[str, Any]) -> Tuple[TemplateCheck, ...]:
+        """
+        Turn a template anomaly configuration into the checks it enables.
+
+        The config is read once here; the returned checks can be reused with
+        run_template_checks for every metrics window the template applies to.
+        Compiled checks are cached by the config's contents, so repeated calls
+        with an equal config skip the lookups.
+
+        Args:
+            anomaly_config: Template anomaly configuration (see analyze_with_template)
+
+        Returns:
+            check(metrics, now, now_iso) callables, one per enabled detector
+        """
+        try:
+            key = tuple(
+                (name, tuple(sorted(anomaly_config[name].items())))
+                for name in TEMPLATE_SECTIONS if name in anomaly_config
+            )
+            return self._compile_template_cached(key)
+        except (AttributeError, TypeError):
+            # Non-dict sections or unhashable values: compile without caching
+            return self._build_template_checks(anomaly_config)
+
+    def _compile_template_key(self, key: Tuple[Tuple[str, tuple], ...]) -> Tuple[TemplateCheck, ...]:
+        return self._build_template_checks({name: dict(items) for name, items in key})
+
+    def _build_template_checks(self, anomaly_config: Dict[str, Any]) -> Tuple[TemplateCheck, ...]:
+        checks: List[TemplateCheck] = []
 
         # Volume spike detection
         spike_config = anomaly_config.get('volume_spike', {})
         if spike_config.get('enabled', False):
-            current = metrics.get('current_count', 0)
-            baseline = metrics.get('baseline_count', 0)
-            threshold = spike_config.get('multiplier', 3.0)
-
-            spike = self.detect_volume_spike(current, baseline, threshold)
-            if spike:
-                anomalies.append(spike)
+            checks.append(partial(self._template_volume_spike, threshold=spike_config.get('multiplier', 3.0)))
 
         # Volume drop detection
         drop_config = anomaly_config.get('volume_drop', {})
         if drop_config.get('enabled', False):
-            current = metrics.get('current_count', 0)
-            baseline = metrics.get('baseline_count', 0)
-            threshold = drop_config.get('threshold', 0.2)
-
-            drop = self.detect_volume_drop(current, baseline, threshold)
-            if drop:
-                anomalies.append(drop)
+            checks.append(partial(self._template_volume_drop, threshold=drop_config.get('threshold', 0.2)))
 
         # Gap detection
         gap_config = anomaly_config.get('gap_detection', {})
         if gap_config.get('enabled', False):
-            last_event = metrics.get('last_event_time')
-            if last_event:
-                # Convert from ISO string if needed
-                if isinstance(last_event, str):
-                    last_event = datetime.fromisoformat(last_event.replace('Z', '+00:00'))
-
-                threshold_minutes = gap_config.get('minutes', 5)
-                gap = self.detect_gap(last_event, threshold_minutes)
-                if gap:
-                    anomalies.append(gap)
-
-        return anomalies
+            checks.append(partial(self._template_gap, threshold_minutes=gap_config.get('minutes', 5)))
+
+        return tuple(checks)
+
+    def run_template_checks(
+        self,
+        metrics: Dict[str, Any],
+        checks: Sequence[TemplateCheck],
+        now: Optional[datetime] = None,
+        now_iso: Optional[str] = None
+    ) -> List[Anomaly]:
+        """Run compiled template checks against one metrics window"""
+        now = now or datetime.utcnow()  # one clock read shared by every detector
+        return [anomaly for anomaly in (check(metrics, now, now_iso) for check in checks) if anomaly]
+
+    def analyze_batch(
+        self,
+        metrics_iter: Iterable[Dict[str, Any]],
+        checks: Sequence[TemplateCheck],
+        now: Optional[datetime] = None
+    ) -> List[List[Anomaly]]:
+        """
+        Run compiled template checks against many metrics windows.
+
+        The clock is read once for the whole batch and the template is
+        compiled by the caller, so the per-window cost is just the checks.
+
+        Args:
+            metrics_iter: Metrics windows (see analyze_with_template)
+            checks: Checks from compile_template
+            now: Detection time shared by the batch (defaults to the current UTC time)
+
+        Returns:
+            Anomalies for each window, in input order
+        """
+        now = now or datetime.utcnow()
+        if not checks:
+            return [[] for _ in metrics_iter]
+
+        # Every anomaly in the batch shares one detected_at string
+        now_iso = now.isoformat()
+        return [
+            [anomaly for anomaly in (check(metrics, now, now_iso) for check in checks) if anomaly]
+            for metrics in metrics_iter
+        ]
+
+    def _template_volume_spike(
+        self,
+        metrics: Dict[str, Any],
+        now: datetime,
+        now_iso: Optional[str],
+        threshold: float
+    ) -> Optional[Anomaly]:
+        return self.detect_volume_spike(
+            metrics.get('current_count', 0), metrics.get('baseline_count', 0), threshold, now=now, now_iso=now_iso
+        )
+
+    def _template_volume_drop(
+        self,
+        metrics: Dict[str, Any],
+        now: datetime,
+        now_iso: Optional[str],
+        threshold: float
+    ) -> Optional[Anomaly]:
+        return self.detect_volume_drop(
+            metrics.get('current_count', 0), metrics.get('baseline_count', 0), threshold, now=now, now_iso=now_iso
+        )
+
+    def _template_gap(
+        self,
+        metrics: Dict[str, Any],
+        now: datetime,
+        now_iso: Optional[str],
+        threshold_minutes: int
+    ) -> Optional[Anomaly]:
+        last_event = metrics.get('last_event_time')
+        if not last_event:
+            return None
+
+        # Convert from ISO string if needed (fromisoformat accepts a trailing 'Z' natively)
+        if isinstance(last_event, str):
+            last_event = datetime.fromisoformat(last_event)
+
+        # detect_gap works in naive UTC; compare offset-aware times in UTC too
+        if last_event.tzinfo is not None:
+            last_event = last_event.astimezone(timezone.utc).replace(tzinfo=None)
+
+        return self.detect_gap(last_event, threshold_minutes, now=now, now_iso=now_iso)
 
 
 # Singleton instance
@@ -3,8 +3,39 @@ CDC Readiness Service
 Validates PostgreSQL configuration for logical replication.
 """
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import atexit
+import hashlib
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+
+# Pooled connections kept per credential (readiness checks reuse them instead
+# of paying TCP/TLS/auth on every call). psycopg2 pools keep at most minconn
+# connections idle and close any returned beyond that.
+CONNECTION_POOL_IDLE = 1
+CONNECTION_POOL_MAX = 4
+CONNECT_TIMEOUT_SECONDS = 10
+
+# Per-table catalog lookup (tables, partitioned tables, views and foreign
+# tables, as listed by information_schema.tables). Prepared per connection so
+# repeat readiness checks skip parse/plan.
+TABLE_CHECK_PREPARE = """
+    PREPARE cdc_table_check(text[], text[]) AS
+    SELECT n.nspname,
+           c.relname,
+           c.relreplident,
+           EXISTS (
+               SELECT 1 FROM pg_constraint k
+               WHERE k.conrelid = c.oid AND k.contype = 'p'
+           )
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE (n.nspname, c.relname) IN (SELECT * FROM unnest($1, $2))
+      AND c.relkind IN ('r', 'p', 'v', 'f')
+"""
+TABLE_CHECK_EXECUTE = "EXECUTE cdc_table_check(%s::text[], %s::text[])"
 
 
 PROVIDER_INSTRUCTIONS = {
@@ -44,6 +75,15 @@ PROVIDER_INSTRUCTIONS = {
 class CDCReadinessService:
     """Validates PostgreSQL database is ready for CDC"""
 
+    def __init__(self):
+        # credential_id -> (connection settings fingerprint, pool)
+        self._pools: Dict[str, Tuple[str, Any]] = {}
+        self._pools_lock = threading.Lock()
+        atexit.register(self.close_pools)
+
+        # Connections that already have cdc_table_check prepared
+        self._prepared_conns: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
     def check_readiness(
         self,
         user_id: str,
@@ -62,7 +102,6 @@ class CDCReadinessService:
             Dictionary with readiness status, checks, and recommendations
         """
         from app.services.credential_service import credential_service
-        import psycopg2
 
         # Get decrypted credentials
         cred_data = credential_service.get_decrypted_credentials(user_id, credential_id)
@@ -72,52 +111,37 @@ class CDCReadinessService:
         credentials = cred_data['credentials']
         username = credentials.get('username')
 
-        # Connect to PostgreSQL
+        # Connect to PostgreSQL (pooled per credential)
         try:
-            conn = psycopg2.connect(
-                host=credentials.get('host'),
-                port=credentials.get('port', 5432),
-                database=credentials.get('database'),
-                user=username,
-                password=credentials.get('password'),
-                connect_timeout=10
-            )
-
-            # Detect provider
-            provider = self._detect_provider(conn)
-
-            # Get PostgreSQL version
-            server_version = self._get_server_version(conn)
-
-            # Run all checks
-            checks = {
-                'wal_level': self._check_wal_level(conn, provider),
-                'replication_privilege': self._check_replication_privilege(conn, username),
-                'replication_slots': self._check_replication_slots(conn),
-                'wal_senders': self._check_wal_senders(conn),
-                'server_version': {
-                    'passed': True,
-                    'value': server_version,
-                    'message': f"PostgreSQL {server_version}"
+            with self._connection(credential_id, credentials) as conn:
+                # Detect provider
+                provider = self._detect_provider(conn)
+
+                # Read every server-level setting the checks need in one round-trip
+                state = self._get_server_state(conn, username)
+                server_version = state['server_version']
+
+                # Run all checks
+                checks = {
+                    'wal_level': self._check_wal_level(state['wal_level'], provider),
+                    'replication_privilege': self._check_replication_privilege(
+                        username, state['has_replication_privilege'], provider
+                    ),
+                    'replication_slots': self._check_replication_slots(
+                        state['max_replication_slots'], state['used_replication_slots']
+                    ),
+                    'wal_senders': self._check_wal_senders(
+                        state['max_wal_senders'], state['active_wal_senders']
+                    ),
+                    'server_version': {
+                        'passed': True,
+                        'value': server_version,
+                        'message': f"PostgreSQL {server_version}"
+                    }
                 }
-            }
-
-            # Check individual tables if specified
-            table_checks = []
-            if tables:
-                for table_name in tables:
-                    # Parse schema.table
-                    if '.' in table_name:
-                        schema, table = table_name.split('.', 1)
-                    else:
-                        schema = 'public'
-                        table = table_name
-
-                    table_check = self._check_table_readiness(conn, schema, table)
-                    table_check['table_name'] = f"{schema}.{table}"
-                    table_checks.append(table_check)
 
-            conn.close()
+                # Check individual tables if specified
+                table_checks = self._check_all_tables(conn, tables) if tables else []
 
             # Determine overall readiness
             critical_checks = [
@@ -137,7 +161,7 @@ class CDCReadinessService:
                 'checks': checks,
                 'table_checks': table_checks,
                 'recommendations': recommendations,
-                'checked_at': datetime.utcnow().isoformat()
+                'checked_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
             }
 
             print(f"[CDC_READINESS] Checked readiness for credential {credential_id}: {'READY' if overall_ready else 'NOT READY'}")
@@ -147,37 +171,121 @@ class CDCReadinessService:
         except Exception as e:
             raise Exception(f"CDC readiness check failed: {str(e)}")
 
-    def _detect_provider(self, conn) -> str:
-        """Detect AWS RDS, Supabase, Cloud SQL, Azure, or self-hosted"""
-        cursor = conn.cursor()
+    @contextmanager
+    def _connection(self, credential_id: str, credentials: Dict[str, Any]) -> Iterator[Any]:
+        """
+        Yield a pooled autocommit connection for a credential.
 
-        # Check for provider-specific settings or extensions
-        cursor.execute("SELECT version()")
-        version_string = cursor.fetchone()[0].lower()
+        The pool is rebuilt if the stored connection settings change. A
+        connection that hit a database error is discarded rather than reused.
+        """
+        import psycopg2
+        from psycopg2 import pool as pg_pool
+
+        params = {
+            'host': credentials.get('host'),
+            'port': credentials.get('port', 5432),
+            'database': credentials.get('database'),
+            'user': credentials.get('username'),
+            'password': credentials.get('password'),
+            'connect_timeout': CONNECT_TIMEOUT_SECONDS,
+            # Keep idle pooled connections alive through NAT/load balancers
+            'keepalives': 1,
+            'keepalives_idle': 60
+        }
+        fingerprint = hashlib.sha256(repr(sorted(params.items())).encode()).hexdigest()
+
+        with self._pools_lock:
+            entry = self._pools.get(credential_id)
+
+        if entry is None or entry[0] != fingerprint:
+            # Opening the pool connects, so do it outside the lock
+            new_pool = pg_pool.ThreadedConnectionPool(CONNECTION_POOL_IDLE, CONNECTION_POOL_MAX, **params)
+            replaced = None
+            with self._pools_lock:
+                current = self._pools.get(credential_id)
+                if current is not None and current[0] == fingerprint:
+                    # Another check created the same pool first
+                    replaced, entry = new_pool, current
+                else:
+                    entry = (fingerprint, new_pool)
+                    self._pools[credential_id] = entry
+                    if current is not None:
+                        replaced = current[1]
+            if replaced is not None:
+                replaced.closeall()
+        pool = entry[1]
 
-        # Check for RDS
-        cursor.execute("""
-            SELECT COUNT(*) FROM pg_settings
-            WHERE name LIKE 'rds.%'
-        """)
-        has_rds_settings = cursor.fetchone()[0] > 0
+        try:
+            conn = pool.getconn()
+        except pg_pool.PoolError:
+            conn = None
+
+        if conn is None:
+            # Every pooled connection is busy; fall back to a one-off connection
+            conn = psycopg2.connect(**params)
+            try:
+                conn.autocommit = True
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        discard = False
+        try:
+            conn.autocommit = True
+            yield conn
+        except psycopg2.Error:
+            discard = True
+            raise
+        finally:
+            self._release(pool, conn, discard)
+
+    def _release(self, pool, conn, discard: bool):
+        """Return a connection to its pool, or close it if the pool was closed meanwhile"""
+        from psycopg2 import pool as pg_pool
 
-        # Check for Cloud SQL
-        cursor.execute("""
-            SELECT COUNT(*) FROM pg_settings
-            WHERE name LIKE 'cloudsql.%'
-        """)
-        has_cloudsql_settings = cursor.fetchone()[0] > 0
+        try:
+            pool.putconn(conn, close=discard or bool(conn.closed))
+        except pg_pool.PoolError:
+            # Pool closed by close_pools() or a credential change while in use
+            if not conn.closed:
+                conn.close()
+
+    def close_pools(self, credential_id: Optional[str] = None):
+        """Close pooled connections for one credential (e.g. when it is deleted), or all of them"""
+        with self._pools_lock:
+            if credential_id is None:
+                entries = list(self._pools.values())
+                self._pools.clear()
+            else:
+                entry = self._pools.pop(credential_id, None)
+                entries = [entry] if entry else []
+
+        for _, pool in entries:
+            pool.closeall()
+
+    def _detect_provider(self, conn) -> str:
+        """Detect AWS RDS, Supabase, Cloud SQL, Azure, or self-hosted"""
+        cursor = conn.cursor()
 
-        # Check for Azure
+        # Version string plus provider-specific settings (RDS, Cloud SQL, Azure)
+        # in a single round-trip
         cursor.execute("""
-            SELECT COUNT(*) FROM pg_settings
-            WHERE name LIKE 'azure.%'
+            SELECT version(),
+                   COUNT(*) FILTER (WHERE name LIKE 'rds.%'),
+                   COUNT(*) FILTER (WHERE name LIKE 'cloudsql.%'),
+                   COUNT(*) FILTER (WHERE name LIKE 'azure.%')
+            FROM pg_settings
         """)
-        has_azure_settings = cursor.fetchone()[0] > 0
-
+        version_string, rds_settings, cloudsql_settings, azure_settings = cursor.fetchone()
         cursor.close()
 
+        version_string = version_string.lower()
+        has_rds_settings = rds_settings > 0
+        has_cloudsql_settings = cloudsql_settings > 0
+        has_azure_settings = azure_settings > 0
+
         # Detect provider
         if has_rds_settings:
             # Check if it's Supabase (which uses RDS)
@@ -191,21 +299,36 @@ class CDCReadinessService:
         else:
             return 'self_hosted'
 
-    def _get_server_version(self, conn) -> str:
-        """Get PostgreSQL version"""
+    def _get_server_state(self, conn, username: str) -> Dict[str, Any]:
+        """
+        Get server version, WAL/replication settings and usage, and the user's
+        replication privilege with a single query
+        """
         cursor = conn.cursor()
-        cursor.execute("SHOW server_version")
-        version = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT current_setting('server_version'),
+                   current_setting('wal_level'),
+                   current_setting('max_replication_slots')::int,
+                   (SELECT COUNT(*) FROM pg_replication_slots),
+                   current_setting('max_wal_senders')::int,
+                   (SELECT COUNT(*) FROM pg_stat_replication),
+                   (SELECT rolreplication FROM pg_roles WHERE rolname = %s)
+        """, [username])
+        row = cursor.fetchone()
         cursor.close()
-        return version
 
-    def _check_wal_level(self, conn, provider: str) -> Dict[str, Any]:
-        """Check SHOW wal_level - must be 'logical'"""
-        cursor = conn.cursor()
-        cursor.execute("SHOW wal_level")
-        wal_level = cursor.fetchone()[0]
-        cursor.close()
+        return {
+            'server_version': row[0],
+            'wal_level': row[1],
+            'max_replication_slots': row[2],
+            'used_replication_slots': row[3],
+            'max_wal_senders': row[4],
+            'active_wal_senders': row[5],
+            'has_replication_privilege': row[6]
+        }
 
+    def _check_wal_level(self, wal_level: str, provider: str) -> Dict[str, Any]:
+        """Check wal_level - must be 'logical'"""
         passed = wal_level == 'logical'
 
         result = {
@@ -221,20 +344,13 @@ class CDCReadinessService:
 
         return result
 
-    def _check_replication_privilege(self, conn, username: str) -> Dict[str, Any]:
-        """Check pg_roles.rolreplication"""
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT rolreplication
-            FROM pg_roles
-            WHERE rolname = %s
-        """, [username])
-
-        result_row = cursor.fetchone()
-        cursor.close()
-
-        has_privilege = result_row and result_row[0]
+    def _check_replication_privilege(
+        self,
+        username: str,
+        has_privilege: Optional[bool],
+        provider: str
+    ) -> Dict[str, Any]:
+        """Check pg_roles.rolreplication (None when the role was not found)"""
 
         result = {
             'passed': has_privilege,
@@ -243,31 +359,12 @@ class CDCReadinessService:
         }
 
         if not has_privilege:
-            # Detect provider to give correct instructions
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM pg_settings WHERE name LIKE 'rds.%'")
-            is_rds = cursor.fetchone()[0] > 0
-            cursor.close()
-
-            provider = 'aws_rds' if is_rds else 'self_hosted'
             result['fix_instruction'] = PROVIDER_INSTRUCTIONS[provider]['replication_privilege']
 
         return result
 
-    def _check_replication_slots(self, conn) -> Dict[str, Any]:
+    def _check_replication_slots(self, max_slots: int, used_slots: int) -> Dict[str, Any]:
         """Check max_replication_slots and available slots"""
-        cursor = conn.cursor()
-
-        # Get max replication slots
-        cursor.execute("SHOW max_replication_slots")
-        max_slots = int(cursor.fetchone()[0])
-
-        # Get current slots in use
-        cursor.execute("SELECT COUNT(*) FROM pg_replication_slots")
-        used_slots = cursor.fetchone()[0]
-
-        cursor.close()
-
         available_slots = max_slots - used_slots
         passed = available_slots > 0
 
@@ -284,19 +381,8 @@ class CDCReadinessService:
 
         return result
 
-    def _check_wal_senders(self, conn) -> Dict[str, Any]:
+    def _check_wal_senders(self, max_wal_senders: int, active_senders: int) -> Dict[str, Any]:
         """Check max_wal_senders"""
-        cursor = conn.cursor()
-
-        cursor.execute("SHOW max_wal_senders")
-        max_wal_senders = int(cursor.fetchone()[0])
-
-        # Get current WAL senders
-        cursor.execute("SELECT COUNT(*) FROM pg_stat_replication")
-        active_senders = cursor.fetchone()[0]
-
-        cursor.close()
-
         available_senders = max_wal_senders - active_senders
         passed = available_senders > 0
 
@@ -313,50 +399,67 @@ class CDCReadinessService:
 
         return result
 
-    def _check_table_readiness(self, conn, schema: str, table: str) -> Dict[str, Any]:
-        """Check REPLICA IDENTITY setting for table"""
+    def _check_all_tables(self, conn, tables: List[str]) -> List[Dict[str, Any]]:
+        """Check every requested table with one catalog query"""
+        from psycopg2 import errors as pg_errors
+
+        qualified = []
+        for table_name in tables:
+            # Parse schema.table
+            if '.' in table_name:
+                schema, table = table_name.split('.', 1)
+            else:
+                schema = 'public'
+                table = table_name
+            qualified.append((schema, table))
+
+        # Existence, replica identity and primary key for all tables at once,
+        # through a statement prepared once per pooled connection
+        params = [[schema for schema, _ in qualified], [table for _, table in qualified]]
         cursor = conn.cursor()
+        try:
+            if conn in self._prepared_conns:
+                try:
+                    cursor.execute(TABLE_CHECK_EXECUTE, params)
+                except pg_errors.InvalidSqlStatementName:
+                    # The server session changed under this connection (transaction
+                    # pooler such as PgBouncer / Supavisor, or DISCARD ALL): prepare again
+                    self._prepared_conns.discard(conn)
+            if conn not in self._prepared_conns:
+                try:
+                    # Prepare and execute in one round-trip
+                    cursor.execute(TABLE_CHECK_PREPARE + "; " + TABLE_CHECK_EXECUTE, params)
+                except pg_errors.DuplicatePreparedStatement:
+                    # This server session already has it (e.g. a pooler's shared backend)
+                    cursor.execute(TABLE_CHECK_EXECUTE, params)
+                self._prepared_conns.add(conn)
+            catalog = {(row[0], row[1]): (row[2], row[3]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
 
-        # Check if table exists
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM information_schema.tables
-            WHERE table_schema = %s
-              AND table_name = %s
-        """, [schema, table])
+        table_checks = []
+        for schema, table in qualified:
+            table_check = self._check_table_readiness(schema, table, catalog.get((schema, table)))
+            table_check['table_name'] = f"{schema}.{table}"
+            table_checks.append(table_check)
 
-        table_exists = cursor.fetchone()[0] > 0
+        return table_checks
 
-        if not table_exists:
-            cursor.close()
+    def _check_table_readiness(
+        self,
+        schema: str,
+        table: str,
+        catalog_row: Optional[tuple]
+    ) -> Dict[str, Any]:
+        """Check REPLICA IDENTITY setting for table from its (relreplident, has_pk) catalog row"""
+        if catalog_row is None:
             return {
                 'passed': False,
                 'exists': False,
                 'message': f"Table {schema}.{table} not found"
             }
 
-        # Check for primary key
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM information_schema.table_constraints
-            WHERE table_schema = %s
-              AND table_name = %s
-              AND constraint_type = 'PRIMARY KEY'
-        """, [schema, table])
-
-        has_primary_key = cursor.fetchone()[0] > 0
-
-        # Check replica identity
-        cursor.execute("""
-            SELECT relreplident
-            FROM pg_class c
-            JOIN pg_namespace n ON n.oid = c.relnamespace
-            WHERE n.nspname = %s
-              AND c.relname = %s
-        """, [schema, table])
-
-        result_row = cursor.fetchone()
-        cursor.close()
+        relreplident, has_primary_key = catalog_row
 
         replica_identity_map = {
             'd': 'DEFAULT',
@@ -365,9 +468,7 @@ class CDCReadinessService:
             'i': 'INDEX'
         }
 
-        replica_identity = 'UNKNOWN'
-        if result_row:
-            replica_identity = replica_identity_map.get(result_row[0], 'UNKNOWN')
+        replica_identity = replica_identity_map.get(relreplident, 'UNKNOWN')
 
         # Determine if table is ready
         issues = []
@@ -291,6 +291,11 @@ class CredentialService:
             if credential:
                 session.delete(credential)
                 session.commit()
+
+                # Drop pooled readiness-check connections opened with these credentials
+                from app.services.cdc_readiness_service import cdc_readiness_service
+                cdc_readiness_service.close_pools(credential_id)
+
                 print(f"[CREDENTIAL] Deleted credential {credential_id}")
                 return True
 
@@ -95,6 +95,7 @@ class DatabaseService:
             pool_pre_ping=True,
             pool_size=5,
             max_overflow=10,
+            pool_recycle=1800,
         )
 
         # Test connection
@@ -16,7 +16,7 @@ Enhanced with 11-step intelligent pipeline creation flow:
 11. Final Confirmation
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
 import json
 import re
 import uuid
@@ -39,6 +39,9 @@ from app.services.conversation_context import (
     clear_context,
 )
 
+# Appended to a streamed answer when the model fails after text was already sent
+STREAM_INTERRUPTED_NOTICE = "Sorry, my response was interrupted before it finished. Please try again."
+
 
 class GeminiService:
     """
@@ -496,6 +499,92 @@ When user says "Delete the audit logs pipeline":
         - Context persistence across the 11-step flow
         """
 
+        session_id, context, history, context_summary = self._begin_turn(message, user_id, session_id)
+
+        # Choose processing method based on agent availability
+        if self.agent is None:
+            response = await self._mock_process(message, history)
+        else:
+            response = await self._langchain_process(message, user_id, history, context_summary)
+
+        return self._finish_turn(message, user_id, session_id, context, history, response)
+
+    async def stream_message(
+        self, message: str, user_id: str, session_id: str = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a chat response as it is generated
+
+        Yields {"delta": str} events while the agent produces text, then a
+        final {"done": True, "content": ..., "actions": ..., "context": ...}
+        event carrying the same fields process_message() returns.
+
+        If the stream fails after text was sent, the answer ends with
+        STREAM_INTERRUPTED_NOTICE and the turn is not saved to history.
+        """
+        session_id, context, history, context_summary = self._begin_turn(message, user_id, session_id)
+        interrupted = False
+
+        if self.agent is None:
+            response = await self._mock_process(message, history)
+            yield {"delta": response["content"]}
+        else:
+            response = None
+            streamed_any = False
+            content_parts: List[str] = []
+            tool_outputs: List[str] = []
+
+            try:
+                from langchain_core.messages import AIMessageChunk, ToolMessage
+
+                messages = self._build_agent_messages(message, history, context_summary)
+                async for chunk, _metadata in self.agent.astream(
+                    {"messages": messages}, stream_mode="messages"
+                ):
+                    if isinstance(chunk, ToolMessage):
+                        if chunk.content:
+                            tool_outputs.append(chunk.content)
+                        # Only text produced after the last tool call is the final answer
+                        content_parts = []
+                    elif isinstance(chunk, AIMessageChunk) and isinstance(chunk.content, str) and chunk.content:
+                        content_parts.append(chunk.content)
+                        streamed_any = True
+                        yield {"delta": chunk.content}
+
+            except Exception as e:
+                print(f"LangChain streaming error: {e}")
+                if not streamed_any:
+                    # Nothing sent yet - fall back to the regular path (incl. its error handling)
+                    response = await self._langchain_process(message, user_id, history, context_summary)
+                    yield {"delta": response["content"]}
+                else:
+                    # Part of the answer is already on screen; flag it as incomplete
+                    interrupted = True
+                    notice = "\n\n" + STREAM_INTERRUPTED_NOTICE
+                    yield {"delta": notice}
+                    response = {"content": "".join(content_parts) + notice, "actions": []}
+
+            if response is None:
+                content = "".join(content_parts) or "I'm sorry, I couldn't process that request."
+                actions = []
+                for tool_output in tool_outputs:
+                    actions = self._extract_actions(tool_output)
+                    if actions:
+                        break
+                if not actions:
+                    actions = self._extract_actions(content)
+                response = {"content": content, "actions": actions}
+
+        response = self._finish_turn(
+            message, user_id, session_id, context, history, response, record_history=not interrupted
+        )
+        yield {"done": True, **response}
+
+    def _begin_turn(self, message: str, user_id: str, session_id: str = None):
+        """Resolve session, context and history for an incoming message
+
+        Returns:
+            Tuple of (session_id, context, history, context_summary)
+        """
         # Set user context for tools
         set_user_context(user_id)
 
@@ -528,18 +617,25 @@ When user says "Delete the audit logs pipeline":
         # Add context summary to the message for the agent
         context_summary = self._build_context_summary(context)
 
-        # Choose processing method based on agent availability
-        if self.agent is None:
-            response = await self._mock_process(message, history)
-        else:
-            response = await self._langchain_process(message, user_id, history, context_summary)
-
-        # Update history
-        history.append({"role": "user", "content": message})
-        history.append({"role": "assistant", "content": response["content"]})
+        return session_id, context, history, context_summary
+
+    def _finish_turn(
+        self,
+        message: str,
+        user_id: str,
+        session_id: str,
+        context: ConversationContext,
+        history: List[Dict],
+        response: Dict[str, Any],
+        record_history: bool = True
+    ) -> Dict[str, Any]:
+        """Record the exchange in history (unless record_history=False) and attach context to the response"""
+        if record_history:
+            history.append({"role": "user", "content": message})
+            history.append({"role": "assistant", "content": response["content"]})
 
-        # Keep only last 20 messages
-        self.conversation_history[user_id] = history[-20:]
+            # Keep only last 20 messages
+            self.conversation_history[user_id] = history[-20:]
 
         # Include context in response for frontend
         response["context"] = {
@@ -607,6 +703,29 @@ When user says "Delete the audit logs pipeline":
 
         return "\n".join(parts)
 
+    def _build_agent_messages(
+        self, message: str, history: List[Dict], context_summary: str = ""
+    ) -> List[Any]:
+        """Convert history plus the current message to LangChain messages"""
+        from langchain_core.messages import HumanMessage, AIMessage
+
+        messages = []
+        for msg in history:
+            if msg["role"] == "user":
+                messages.append(HumanMessage(content=msg["content"]))
+            else:
+                messages.append(AIMessage(content=msg["content"]))
+
+        # Add current message with context if available
+        if context_summary:
+            # Inject context into the message so the agent knows where we are
+            enhanced_message = f"{message}{context_summary}"
+            messages.append(HumanMessage(content=enhanced_message))
+        else:
+            messages.append(HumanMessage(content=message))
+
+        return messages
+
     async def _langchain_process(
         self, message: str, user_id: str, history: List[Dict], context_summary: str = ""
     ) -> Dict[str, Any]:
@@ -615,23 +734,7 @@ When user says "Delete the audit logs pipeline":
         Enhanced with context injection for the 11-step pipeline flow.
         """
         try:
-            from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-
-            # Convert history to LangChain message format
-            messages = []
-            for msg in history:
-                if msg["role"] == "user":
-                    messages.append(HumanMessage(content=msg["content"]))
-                else:
-                    messages.append(AIMessage(content=msg["content"]))
-
-            # Add current message with context if available
-            if context_summary:
-                # Inject context into the message so the agent knows where we are
-                enhanced_message = f"{message}{context_summary}"
-                messages.append(HumanMessage(content=enhanced_message))
-            else:
-                messages.append(HumanMessage(content=message))
+            messages = self._build_agent_messages(message, history, context_summary)
 
             # Run the agent with messages
             result = await self.agent.ainvoke({
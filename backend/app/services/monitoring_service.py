@@ -8,7 +8,7 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
-from app.services.anomaly_detector import anomaly_detector
+from app.services.anomaly_detector import anomaly_detector, Anomaly, RollingBaseline
 from app.services.alert_service import alert_service
 
 
@@ -26,6 +26,8 @@ class MonitoringService:
         self._last_event_cache: Dict[str, datetime] = {}
         # Cache to track event counts for volume detection
         self._event_count_cache: Dict[str, List[int]] = {}
+        # Streaming baselines for z-score volume rules (O(1) state per pipeline)
+        self._volume_baselines: Dict[str, RollingBaseline] = {}
 
     def _get_session(self):
         """Get database session"""
@@ -122,6 +124,14 @@ class MonitoringService:
                     rule.threshold_config.get('minutes', 5)
                 )
 
+            elif rule.rule_type in ('volume_spike', 'volume_drop') and 'z_threshold' in rule.threshold_config:
+                anomaly = self._check_volume_zscore(
+                    pipeline_id,
+                    metrics.get('event_count', 0),
+                    rule.threshold_config['z_threshold'],
+                    rule.rule_type
+                )
+
             elif rule.rule_type == 'volume_spike':
                 anomaly = self._check_volume_spike(
                     pipeline_id,
@@ -137,18 +147,25 @@ class MonitoringService:
                 )
 
             if anomaly:
-                # Add pipeline info to anomaly
+                # Alerts take the dict form; add pipeline info to it
+                anomaly = anomaly.to_dict()
                 anomaly['pipeline_id'] = pipeline_id
                 anomaly['pipeline_name'] = pipeline.name
 
                 # Send alert
                 try:
-                    result = alert_service.send_alert(rule.id, anomaly)
+                    # DB writes run off the event loop; email goes out in the background
+                    result = await alert_service.send_alert_async(rule.id, anomaly)
                     if result:
                         print(f"[MONITOR] Alert sent for pipeline {pipeline.name}: {anomaly['type']}")
                 except Exception as e:
                     print(f"[MONITOR] Failed to send alert: {e}")
 
+        # Fold this window into the streaming baseline once every rule has seen it
+        baseline = self._volume_baselines.get(pipeline_id)
+        if baseline is not None:
+            baseline.update(metrics.get('event_count', 0))
+
     async def _get_pipeline_metrics(self, pipeline) -> Optional[Dict[str, Any]]:
         """Get current metrics for a pipeline by querying the source database"""
         from app.services.credential_service import credential_service
@@ -234,7 +251,7 @@ class MonitoringService:
         pipeline_id: str,
         last_event_time: Optional[datetime],
         gap_minutes: int
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Anomaly]:
         """Check for event gaps"""
         if not last_event_time:
             return None
@@ -248,7 +265,7 @@ class MonitoringService:
         pipeline_id: str,
         current_count: int,
         multiplier: float
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Anomaly]:
         """Check for volume spikes"""
         # Get historical counts for baseline
         history = self._event_count_cache.get(pipeline_id, [])
@@ -275,7 +292,7 @@ class MonitoringService:
         pipeline_id: str,
         current_count: int,
         threshold: float
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Anomaly]:
         """Check for volume drops"""
         # Get historical counts for baseline
         history = self._event_count_cache.get(pipeline_id, [])
@@ -290,6 +307,23 @@ class MonitoringService:
         anomaly = anomaly_detector.detect_volume_drop(current_count, baseline, threshold)
         return anomaly
 
+    def _check_volume_zscore(
+        self,
+        pipeline_id: str,
+        current_count: int,
+        z_threshold: float,
+        rule_type: str
+    ) -> Optional[Anomaly]:
+        """Check for volume spikes/drops as a z-score against the rolling baseline"""
+        baseline = self._volume_baselines.get(pipeline_id)
+        if baseline is None:
+            baseline = self._volume_baselines[pipeline_id] = RollingBaseline()
+
+        anomaly = anomaly_detector.detect_volume_deviation(current_count, baseline, z_threshold)
+        if anomaly and anomaly.type != rule_type:
+            return None
+        return anomaly
+
     def check_now(self, pipeline_id: str = None) -> Dict[str, Any]:
         """
         Manually trigger a check (for testing/debugging).
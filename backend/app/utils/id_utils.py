@@ -0,0 +1,27 @@
+"""
+ID Utilities
+Time-ordered UUIDs for high-volume insert tables.
+"""
+
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a UUIDv7 (RFC 9562): 48-bit Unix ms timestamp followed by random bits.
+
+    IDs sort by creation time, so new rows land at the tail of the primary key
+    index instead of on random B-tree pages. Use uuid4 where IDs must not leak
+    their creation time.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76                          # version
+    value |= ((rand >> 62) & 0xFFF) << 64       # rand_a (12 bits)
+    value |= 0b10 << 62                         # RFC 4122 variant
+    value |= rand & ((1 << 62) - 1)             # rand_b (62 bits)
+    return uuid.UUID(int=value)
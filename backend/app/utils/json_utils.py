@@ -0,0 +1,32 @@
+"""
+JSON Utilities
+Fast JSON encoding/decoding backed by orjson, with a stdlib fallback.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+def dumps(obj: Any, *args, **kwargs) -> str:
+    """
+    Serialize obj to a compact JSON string.
+
+    Extra arguments (e.g. separators) are accepted for stdlib compatibility
+    and ignored by orjson, which always emits compact output.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    kwargs.setdefault('separators', (',', ':'))
+    return json.dumps(obj, *args, **kwargs)
+
+
+def loads(data: Any, *args, **kwargs) -> Any:
+    """Deserialize a JSON str/bytes document"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data, *args, **kwargs)
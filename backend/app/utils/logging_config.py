@@ -0,0 +1,48 @@
+"""
+Logging Configuration
+Routes application logs through a queue so handler I/O runs on a background
+thread instead of blocking the asyncio event loop.
+"""
+
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Attach a QueueHandler to the `app` logger (idempotent).
+
+    Records are formatted and written to stderr by a QueueListener thread.
+    """
+    global _listener
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level)
+
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,296 @@
+"""
+Alert Service Tests
+Schedule/cooldown gating, duplicate collapsing and SMTP connection reuse,
+run against a fake DB session and SMTP client (no database or SMTP server
+required).
+
+Run with: python -m pytest tests/test_alert_service.py -v
+"""
+
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from app.services import alert_service as alert_module
+from app.services.alert_service import AlertService, _CachedRule
+
+RULE_ID = 'rule-1'
+
+
+class FakeQuery:
+    def __init__(self, session):
+        self.session = session
+        self.history_id = None
+
+    def filter(self, criterion):
+        self.history_id = criterion.right.value
+        return self
+
+    def update(self, values, synchronize_session=None):
+        self.session.updates.append((self.history_id, values))
+        return 1
+
+
+class FakeSession:
+    """Records history rows and updates; the rule UPDATE is slowed to widen races"""
+
+    def __init__(self):
+        self.added = []
+        self.updates = []
+
+    def execute(self, statement):
+        time.sleep(0.01)
+        return type('Result', (), {'rowcount': 1})()
+
+    def add_all(self, rows):
+        self.added.extend(rows)
+
+    def query(self, model):
+        return FakeQuery(self)
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        pass
+
+
+def make_rule(**overrides) -> _CachedRule:
+    fields = dict(
+        id=RULE_ID,
+        name='Orders volume',
+        rule_type='volume_spike',
+        severity='warning',
+        is_active=True,
+        enabled_days=list(range(7)),
+        enabled_hours=None,
+        cooldown_minutes=0,
+        recipients=['ops@example.com'],
+        threshold_config={},
+        last_triggered_at=None,
+        cached_at=time.monotonic(),
+        days_mask=(1 << 7) - 1
+    )
+    fields.update(overrides)
+    return _CachedRule(**fields)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """AlertService wired to one FakeSession, with email delivery captured"""
+    service = AlertService()
+    session = FakeSession()
+    emails = []
+
+    @contextmanager
+    def fake_session():
+        yield session
+
+    monkeypatch.setattr(service, '_session', fake_session)
+    monkeypatch.setattr(service._email_executor, 'submit', lambda fn, jobs: emails.extend(jobs))
+    service.fake_session = session
+    service.emails = emails
+    yield service
+    service._email_executor.shutdown()
+
+
+def test_concurrent_sends_respect_cooldown(service):
+    service._rule_cache[RULE_ID] = make_rule(cooldown_minutes=30)
+    anomaly = {'type': 'volume_spike', 'message': 'Volume spike: 500 events'}
+    barrier = threading.Barrier(8)
+    results = []
+
+    def send():
+        barrier.wait()
+        results.append(service.send_alert(RULE_ID, anomaly))
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(result is not None for result in results) == 1
+    assert len(service.fake_session.added) == 1
+
+
+def spike(events: int, **fields):
+    return {
+        'type': 'volume_spike',
+        'severity': 'warning',
+        'pipeline_id': 'pipeline-1',
+        'message': f'Volume spike: {events} events',
+        **fields
+    }
+
+
+def test_repeats_with_changing_counts_are_collapsed(service):
+    service._rule_cache[RULE_ID] = make_rule(threshold_config={'cache_minutes': 10})
+
+    first = service.send_alert(RULE_ID, spike(500))
+    repeat = service.send_alert(RULE_ID, spike(650))
+
+    assert first is not None
+    assert repeat is None
+    assert len(service.fake_session.added) == 1
+    history_id, values = service.fake_session.updates[0]
+    assert history_id == first['id']
+    assert 'title' not in values
+
+
+def test_different_pipelines_are_not_collapsed(service):
+    service._rule_cache[RULE_ID] = make_rule(threshold_config={'cache_minutes': 10})
+
+    service.send_alert(RULE_ID, spike(500))
+    service.send_alert(RULE_ID, spike(500, pipeline_id='pipeline-2'))
+
+    assert len(service.fake_session.added) == 2
+
+
+def test_sampling_last_replaces_title_across_windows(service):
+    service._rule_cache[RULE_ID] = make_rule(threshold_config={'cache_minutes': 10, 'sampling': 'last'})
+
+    service.send_alert(RULE_ID, spike(500))
+    service.send_alert(RULE_ID, spike(650))
+
+    _, values = service.fake_session.updates[0]
+    assert values['title'] == '[WARNING] volume_spike: Volume spike: 650 events'
+    assert '650 events' in values['message']
+
+
+def test_sampling_last_replaces_title_within_batch(service):
+    service._rule_cache[RULE_ID] = make_rule(threshold_config={'cache_minutes': 10, 'sampling': 'last'})
+
+    results = service.send_alerts_bulk(RULE_ID, [spike(500), spike(650)])
+
+    assert len(results) == 1
+    assert results[0]['occurrence_count'] == 2
+    assert results[0]['title'].endswith('650 events')
+    assert service.emails[0][2] == results[0]['title']
+
+
+class FakeSMTP:
+    """Stands in for _ResolvedSMTP; records every connection opened"""
+
+    opened = []
+
+    def __init__(self, host, address, port, timeout):
+        self.host = host
+        self.address = address
+        self.sent = []
+        self.alive = True
+        self.closed = False
+        FakeSMTP.opened.append(self)
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        self.sent.append(to_addrs)
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("connection closed")
+        return 250, b'OK'
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def smtp(monkeypatch, service):
+    FakeSMTP.opened = []
+    monkeypatch.setattr(alert_module, '_ResolvedSMTP', FakeSMTP)
+    monkeypatch.setattr(service, '_smtp_address', lambda: '10.0.0.25')
+    return FakeSMTP.opened
+
+
+def email_jobs(count):
+    return [(['ops@example.com'], f'Alert {index}', '<p>body</p>') for index in range(count)]
+
+
+def test_smtp_connection_reused_across_sends(service, smtp):
+    assert service._send_email_many(email_jobs(3)) == [None, None, None]
+    assert service._send_email_many(email_jobs(2)) == [None, None]
+
+    assert len(smtp) == 1
+    assert len(smtp[0].sent) == 5
+
+
+def test_dead_pooled_smtp_connection_is_replaced(service, smtp):
+    service._send_email_many(email_jobs(1))
+    smtp[0].alive = False
+
+    service._send_email_many(email_jobs(1))
+
+    assert len(smtp) == 2
+    assert smtp[0].closed
+    assert len(smtp[1].sent) == 1
+
+
+def test_smtp_connection_recycled_after_message_limit(service, smtp, monkeypatch):
+    monkeypatch.setattr(alert_module, 'SMTP_POOL_MSGS_PER_CONN', 2)
+
+    service._send_email_many(email_jobs(2))
+    service._send_email_many(email_jobs(1))
+
+    assert len(smtp) == 2
+    assert smtp[0].closed
+
+
+def test_smtp_connects_to_cached_address_with_hostname(service, smtp):
+    service._send_email_many(email_jobs(1))
+
+    assert smtp[0].host == service.smtp_host
+    assert smtp[0].address == '10.0.0.25'
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(alert_module.time, 'sleep', delays.append)
+    return delays
+
+
+def failing_sendmail(*errors):
+    """sendmail that raises each error in turn, then succeeds"""
+    pending = list(errors)
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if pending:
+            raise pending.pop(0)
+        self.sent.append(to_addrs)
+    return sendmail
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPRecipientsRefused({'ops@example.com': (550, b'No such user')}),
+    smtplib.SMTPSenderRefused(553, b'Sender rejected', 'alerts@dataflow-ai.local'),
+    smtplib.SMTPAuthenticationError(535, b'Authentication failed'),
+    smtplib.SMTPDataError(554, b'Message rejected'),
+])
+def test_permanent_email_errors_are_not_retried(service, smtp, sleeps, monkeypatch, error):
+    monkeypatch.setattr(FakeSMTP, 'sendmail', failing_sendmail(error))
+
+    service._deliver_emails([('history-1', ['ops@example.com'], 'Alert', '<p>body</p>')])
+
+    assert sleeps == []
+    assert sum(len(conn.sent) for conn in smtp) == 0
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPServerDisconnected('Connection unexpectedly closed'),
+    ConnectionResetError(104, 'Connection reset by peer'),
+    TimeoutError('timed out'),
+    smtplib.SMTPDataError(451, b'Try again later'),
+])
+def test_transient_email_errors_are_retried(service, smtp, sleeps, monkeypatch, error):
+    monkeypatch.setattr(FakeSMTP, 'sendmail', failing_sendmail(error))
+
+    service._deliver_emails([('history-1', ['ops@example.com'], 'Alert', '<p>body</p>')])
+
+    assert sleeps == [1]
+    assert sum(len(conn.sent) for conn in smtp) == 1
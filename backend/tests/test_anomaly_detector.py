@@ -0,0 +1,121 @@
+"""
+Anomaly Detector Tests
+Rolling baselines, z-score volume rules, anomaly serialization and
+compiled template checks.
+
+Run with: python -m pytest tests/test_anomaly_detector.py -v
+"""
+
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.anomaly_detector import AnomalyDetectorService, RollingBaseline
+from app.services.monitoring_service import MonitoringService
+
+COUNTS = [980, 1010, 1005, 990, 1020, 995]
+
+
+def baseline_of(counts):
+    baseline = RollingBaseline()
+    for count in counts:
+        baseline.update(count)
+    return baseline
+
+
+def test_rolling_baseline_matches_batch_statistics():
+    baseline = baseline_of(COUNTS)
+
+    assert baseline.n == len(COUNTS)
+    assert baseline.mean == pytest.approx(statistics.fmean(COUNTS))
+    assert baseline.std() == pytest.approx(statistics.pstdev(COUNTS))
+
+
+def test_rolling_baseline_empty_and_constant():
+    assert RollingBaseline().std() == 0.0
+    assert baseline_of([50, 50, 50]).std() == 0.0
+
+
+def test_volume_deviation_spike_and_drop():
+    detector = AnomalyDetectorService()
+    baseline = baseline_of(COUNTS)
+
+    spike = detector.detect_volume_deviation(1100, baseline, z_threshold=3.0)
+    drop = detector.detect_volume_deviation(800, baseline, z_threshold=3.0)
+
+    assert spike.type == 'volume_spike'
+    assert spike.details['z_score'] > 3.0
+    assert drop.type == 'volume_drop'
+    assert drop.severity == 'critical'
+    assert detector.detect_volume_deviation(1000, baseline, z_threshold=3.0) is None
+
+
+def test_volume_deviation_needs_samples_and_spread():
+    detector = AnomalyDetectorService()
+
+    assert detector.detect_volume_deviation(5000, baseline_of(COUNTS[:2])) is None
+    assert detector.detect_volume_deviation(5000, baseline_of([100, 100, 100])) is None
+
+
+def test_to_dict_rounds_without_mutating_details():
+    anomaly = AnomalyDetectorService().detect_volume_deviation(1100, baseline_of(COUNTS))
+
+    details = anomaly.to_dict()['details']
+
+    assert details['z_score'] == round(anomaly.details['z_score'], 2)
+    assert anomaly.details['baseline_std'] == pytest.approx(statistics.pstdev(COUNTS))
+    assert anomaly.details['baseline_std'] != details['baseline_std']
+
+
+def test_zscore_rule_only_reports_its_own_direction():
+    monitor = MonitoringService()
+    monitor._volume_baselines['pipeline-1'] = baseline_of(COUNTS)
+
+    assert monitor._check_volume_zscore('pipeline-1', 800, 3.0, 'volume_spike') is None
+    assert monitor._check_volume_zscore('pipeline-1', 800, 3.0, 'volume_drop').type == 'volume_drop'
+
+
+def test_zscore_rule_starts_a_baseline_per_pipeline():
+    monitor = MonitoringService()
+
+    assert monitor._check_volume_zscore('pipeline-new', 1000, 3.0, 'volume_spike') is None
+    assert monitor._volume_baselines['pipeline-new'].n == 0
+
+
+def test_equal_template_configs_share_compiled_checks():
+    detector = AnomalyDetectorService()
+    config = {'volume_spike': {'enabled': True, 'multiplier': 2.0}, 'gap_detection': {'enabled': True, 'minutes': 5}}
+    equal = {'gap_detection': {'minutes': 5, 'enabled': True}, 'volume_spike': {'multiplier': 2.0, 'enabled': True}}
+
+    first = detector.compile_template(config)
+    second = detector.compile_template(equal)
+
+    assert first is second
+    assert len(first) == 2
+    assert detector._compile_template_cached.cache_info().hits == 1
+    assert detector.compile_template({'volume_spike': {'enabled': True, 'multiplier': 4.0}}) is not first
+
+
+def test_unhashable_template_config_compiles_without_cache():
+    detector = AnomalyDetectorService()
+
+    checks = detector.compile_template({'volume_spike': {'enabled': True, 'multiplier': 2.0, 'tags': ['ads']}})
+
+    assert len(checks) == 1
+    assert detector._compile_template_cached.cache_info().currsize == 0
+
+
+def test_compiled_template_detects_anomalies():
+    detector = AnomalyDetectorService()
+    config = {
+        'volume_spike': {'enabled': True, 'multiplier': 2.0},
+        'gap_detection': {'enabled': True, 'minutes': 5}
+    }
+    now = datetime(2026, 1, 5, 12, 0)
+    metrics = {'current_count': 300, 'baseline_count': 100, 'last_event_time': now - timedelta(minutes=20)}
+
+    anomalies = detector.run_template_checks(metrics, detector.compile_template(config), now=now)
+
+    assert sorted(anomaly.type for anomaly in anomalies) == ['gap_detection', 'volume_spike']
+    assert detector.analyze_with_template({'current_count': 100, 'baseline_count': 100, 'last_event_time': None}, config) == []
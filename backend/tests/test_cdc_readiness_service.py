@@ -0,0 +1,201 @@
+"""
+CDC Readiness Service Tests
+Connection pooling and batched catalog checks, run against a fake psycopg2
+connection (no database required).
+
+Run with: python -m pytest tests/test_cdc_readiness_service.py -v
+"""
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from app.services import credential_service as credential_module
+from app.services.cdc_readiness_service import CDCReadinessService
+
+CREDENTIALS = {
+    'credentials': {
+        'host': 'db.example.com',
+        'port': 5432,
+        'database': 'app',
+        'username': 'cdc_user',
+        'password': 'secret'
+    }
+}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql)
+        if 'version()' in sql:
+            self._rows = [('PostgreSQL 15.4 on x86_64-pc-linux-gnu', 0, 0, 0)]
+        elif "current_setting('server_version')" in sql:
+            self._rows = [('15.4', 'logical', 10, 1, 10, 0, True)]
+        elif 'cdc_table_check' in sql:
+            if 'PREPARE' in sql:
+                if self.conn.prepared:
+                    raise psycopg2.errors.DuplicatePreparedStatement("prepared statement already exists")
+                self.conn.prepared = True
+            elif not self.conn.prepared:
+                raise psycopg2.errors.InvalidSqlStatementName("prepared statement does not exist")
+            schemas, names = params
+            self._rows = [
+                (schema, name, 'd', name != 'events')
+                for schema, name in zip(schemas, names) if name != 'missing'
+            ]
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.executed = []
+        self.prepared = False
+        self.info = type('Info', (), {'transaction_status': psycopg2.extensions.TRANSACTION_STATUS_IDLE})()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Route psycopg2.connect (used by psycopg2.pool) to fake connections"""
+    opened = []
+
+    def connect(*args, **kwargs):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, 'connect', connect)
+    monkeypatch.setattr(
+        credential_module.credential_service,
+        'get_decrypted_credentials',
+        lambda user_id, credential_id: CREDENTIALS
+    )
+    return opened
+
+
+def test_second_check_reuses_pooled_connection(connections):
+    service = CDCReadinessService()
+
+    first = service.check_readiness('user-1', 'cred-1')
+    second = service.check_readiness('user-1', 'cred-1')
+
+    assert first['overall_ready'] and second['overall_ready']
+    assert len(connections) == 1
+    assert not connections[0].closed
+    assert connections[0].autocommit
+
+
+def test_changed_credentials_replace_the_pool(connections, monkeypatch):
+    service = CDCReadinessService()
+    service.check_readiness('user-1', 'cred-1')
+
+    rotated = {'credentials': {**CREDENTIALS['credentials'], 'password': 'rotated'}}
+    monkeypatch.setattr(
+        credential_module.credential_service,
+        'get_decrypted_credentials',
+        lambda user_id, credential_id: rotated
+    )
+    service.check_readiness('user-1', 'cred-1')
+
+    assert len(connections) == 2
+    assert connections[0].closed
+    assert not connections[1].closed
+
+
+def test_pool_closed_while_connection_in_use(connections):
+    service = CDCReadinessService()
+
+    with service._connection('cred-1', CREDENTIALS['credentials']) as conn:
+        service.close_pools('cred-1')
+
+    # Returning to the closed pool must not raise; the connection is closed instead
+    assert conn.closed
+
+
+def test_connection_discarded_after_database_error(connections):
+    service = CDCReadinessService()
+
+    with pytest.raises(psycopg2.OperationalError):
+        with service._connection('cred-1', CREDENTIALS['credentials']):
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    service.check_readiness('user-1', 'cred-1')
+
+    assert len(connections) == 2
+    assert connections[0].closed
+
+
+def test_all_tables_checked_in_one_query(connections):
+    service = CDCReadinessService()
+
+    result = service.check_readiness('user-1', 'cred-1', ['public.users', 'events', 'public.missing'])
+
+    checks = {check['table_name']: check for check in result['table_checks']}
+    assert checks['public.users']['passed']
+    assert not checks['public.events']['has_primary_key']
+    assert not checks['public.missing']['exists']
+    table_queries = [sql for sql in connections[0].executed if 'cdc_table_check' in sql]
+    assert len(table_queries) == 1
+
+
+def test_table_check_prepared_once_per_connection(connections):
+    service = CDCReadinessService()
+
+    service.check_readiness('user-1', 'cred-1', ['public.users'])
+    service.check_readiness('user-1', 'cred-1', ['public.users', 'public.orders'])
+
+    table_queries = [sql for sql in connections[0].executed if 'cdc_table_check' in sql]
+    assert len(table_queries) == 2
+    assert 'PREPARE' in table_queries[0]
+    assert table_queries[1].startswith('EXECUTE')
+
+
+def test_prepared_statement_lost_between_checks(connections):
+    service = CDCReadinessService()
+    service.check_readiness('user-1', 'cred-1', ['public.users'])
+
+    # Server session swapped by a transaction pooler (or DISCARD ALL)
+    connections[0].prepared = False
+    result = service.check_readiness('user-1', 'cred-1', ['public.users'])
+
+    assert result['table_checks'][0]['passed']
+    table_queries = [sql for sql in connections[0].executed if 'cdc_table_check' in sql]
+    assert table_queries[1].startswith('EXECUTE')
+    assert 'PREPARE' in table_queries[2]
+    assert not connections[0].closed
+
+
+def test_statement_already_prepared_on_server(connections):
+    service = CDCReadinessService()
+    service.check_readiness('user-1', 'cred-1', ['public.users'])
+
+    # Client lost track, but the server session still has the statement
+    service._prepared_conns.clear()
+    result = service.check_readiness('user-1', 'cred-1', ['public.users'])
+
+    assert result['table_checks'][0]['passed']
+    table_queries = [sql for sql in connections[0].executed if 'cdc_table_check' in sql]
+    assert 'PREPARE' in table_queries[1]
+    assert table_queries[2].startswith('EXECUTE')
+    assert not connections[0].closed
@@ -0,0 +1,59 @@
+"""
+Gemini Service Tests
+Streamed chat responses, run against a fake LangGraph agent (no API key
+required).
+
+Run with: python -m pytest tests/test_gemini_service.py -v
+"""
+
+import asyncio
+
+from langchain_core.messages import AIMessageChunk
+
+from app.services.gemini_service import GeminiService, STREAM_INTERRUPTED_NOTICE
+
+
+class FakeAgent:
+    """Streams the given text chunks, then optionally fails"""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    async def astream(self, inputs, stream_mode=None):
+        for chunk in self.chunks:
+            yield AIMessageChunk(content=chunk), {}
+        if self.error is not None:
+            raise self.error
+
+
+def stream(service, message):
+    async def collect():
+        return [event async for event in service.stream_message(message, 'user-1')]
+    return asyncio.run(collect())
+
+
+def test_completed_stream_is_saved_to_history():
+    service = GeminiService()
+    service.agent = FakeAgent(['Your orders ', 'table is ready.'])
+
+    events = stream(service, 'is my orders table ready?')
+
+    assert [event['delta'] for event in events[:-1]] == ['Your orders ', 'table is ready.']
+    assert events[-1]['done']
+    assert events[-1]['content'] == 'Your orders table is ready.'
+    assert service.conversation_history['user-1'][-1] == {
+        'role': 'assistant', 'content': 'Your orders table is ready.'
+    }
+
+
+def test_interrupted_stream_reports_error_and_skips_history():
+    service = GeminiService()
+    service.agent = FakeAgent(['Your orders '], error=RuntimeError('stream reset'))
+
+    events = stream(service, 'is my orders table ready?')
+
+    assert events[-2]['delta'].endswith(STREAM_INTERRUPTED_NOTICE)
+    assert events[-1]['content'] == 'Your orders \n\n' + STREAM_INTERRUPTED_NOTICE
+    assert events[-1]['actions'] == []
+    assert service.conversation_history['user-1'] == []
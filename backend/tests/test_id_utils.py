@@ -0,0 +1,39 @@
+"""
+ID Utilities Tests
+UUIDv7 layout and ordering.
+
+Run with: python -m pytest tests/test_id_utils.py -v
+"""
+
+import time
+import uuid
+
+from app.utils.id_utils import uuid7
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert uuid.UUID(str(value)) == value
+
+
+def test_uuid7_embeds_creation_time():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert before <= value.int >> 80 <= after
+
+
+def test_uuid7_sorts_by_creation_time():
+    earlier = uuid7()
+    time.sleep(0.002)
+    later = uuid7()
+
+    assert str(earlier) < str(later)
+
+
+def test_uuid7_values_are_unique():
+    assert len({uuid7() for _ in range(10_000)}) == 10_000
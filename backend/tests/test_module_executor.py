@@ -0,0 +1,194 @@
+"""
+Module Executor Tests
+Batched CDC readiness checks and connection pool caching, run against fake
+asyncpg pools (no database required).
+
+Run with: python -m pytest tests/test_module_executor.py -v
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.modules import executor as executor_module
+from app.modules.executor import ModuleExecutor
+
+# SHOW results and scalar queries as PostgreSQL returns them
+PG_SETTINGS = {
+    'wal_level': 'logical',
+    'max_replication_slots': '10',
+    'max_wal_senders': '0'
+}
+PG_ROLE_QUERY = "SELECT rolreplication FROM pg_roles WHERE rolname = current_user"
+
+
+class FakeStatement:
+    def __init__(self, conn, sql):
+        self.conn = conn
+        self.sql = sql
+
+    async def fetchrow(self, *params):
+        if 'current_setting' in self.sql:
+            if self.conn.fail_batch:
+                raise RuntimeError("batched statement rejected")
+            values = iter(params)
+            row = []
+            for column in self.sql[len('SELECT '):].split(', '):
+                row.append(PG_SETTINGS[next(values)] if column.startswith('current_setting') else 'true')
+            return row
+        if self.sql.startswith('SHOW '):
+            return [PG_SETTINGS[self.sql[len('SHOW '):]]]
+        assert self.sql == PG_ROLE_QUERY
+        return [True]
+
+
+class FakeConnection:
+    def __init__(self, fail_batch=False):
+        self.fail_batch = fail_batch
+        self.prepared = []
+
+    async def prepare(self, sql):
+        self.prepared.append(sql)
+        return FakeStatement(self, sql)
+
+
+class FakePool:
+    def __init__(self, conn=None):
+        self.conn = conn
+        self.closed = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+    async def close(self):
+        self.closed = True
+
+
+def run_pg_checks(conn):
+    executor = ModuleExecutor()
+
+    async def get_pool(connection_params):
+        return FakePool(conn)
+
+    executor._get_pg_pool = get_pool
+    return asyncio.run(executor.check_cdc_readiness('postgresql', {'host': 'db.example.com'}))
+
+
+def test_pg_cdc_checks_run_as_one_statement():
+    conn = FakeConnection()
+
+    result = run_pg_checks(conn)
+
+    assert len(conn.prepared) == 1
+    assert conn.prepared[0].count('current_setting') == 3
+    assert [check['actual'] for check in result.checks] == ['logical', 'true', '10', '0']
+
+
+def test_pg_cdc_expected_min_compares_numerically():
+    result = run_pg_checks(FakeConnection())
+
+    checks = {check['name']: check for check in result.checks}
+    assert checks['Max Replication Slots']['passed']
+    assert checks['Max Replication Slots']['expected'] == '>= 1'
+    assert not checks['Max WAL Senders']['passed']
+    assert not result.is_ready
+    assert result.missing_requirements == ['Max WAL Senders: expected >= 1, got 0']
+
+
+def test_pg_cdc_checks_fall_back_to_individual_queries():
+    conn = FakeConnection(fail_batch=True)
+
+    result = run_pg_checks(conn)
+
+    assert len(conn.prepared) == 5
+    assert [check['passed'] for check in result.checks] == [True, True, True, False]
+
+
+def test_pg_cdc_actual_values_same_type_on_both_paths():
+    batched = run_pg_checks(FakeConnection())
+    individual = run_pg_checks(FakeConnection(fail_batch=True))
+
+    assert [check['actual'] for check in individual.checks] == [check['actual'] for check in batched.checks]
+
+
+def test_check_values_normalised_to_text():
+    assert ModuleExecutor._check_value_text(True) == 'true'
+    assert ModuleExecutor._check_value_text(5) == '5'
+    assert ModuleExecutor._check_value_text(None) is None
+
+
+def test_expected_min_rejects_non_numeric_values():
+    check = {'expected_min': 1}
+
+    assert ModuleExecutor._check_passed(check, '4')
+    assert not ModuleExecutor._check_passed(check, None)
+    assert not ModuleExecutor._check_passed(check, 'off')
+
+
+def test_pools_cached_per_connection_params():
+    executor = ModuleExecutor()
+    created = []
+
+    async def create_pool():
+        created.append(FakePool())
+        return created[-1]
+
+    async def run():
+        first = await executor._get_pool('postgresql', {'host': 'a'}, create_pool)
+        again = await executor._get_pool('postgresql', {'host': 'a'}, create_pool)
+        other = await executor._get_pool('postgresql', {'host': 'b'}, create_pool)
+        return first, again, other
+
+    first, again, other = asyncio.run(run())
+
+    assert first is again
+    assert other is not first
+    assert len(created) == 2
+
+
+def test_least_recently_used_pools_evicted_and_closed(monkeypatch):
+    monkeypatch.setattr(executor_module, 'MAX_CACHED_POOLS', 2)
+    executor = ModuleExecutor()
+    created = []
+
+    async def create_pool():
+        created.append(FakePool())
+        return created[-1]
+
+    async def run():
+        await executor._get_pool('postgresql', {'host': 'a'}, create_pool)
+        await executor._get_pool('postgresql', {'host': 'b'}, create_pool)
+        await executor._get_pool('postgresql', {'host': 'a'}, create_pool)
+        await executor._get_pool('postgresql', {'host': 'c'}, create_pool)
+        await asyncio.gather(*executor._closing_pools)
+        evicted = [pool.closed for pool in created]
+        await executor.close()
+        return evicted
+
+    evicted = asyncio.run(run())
+
+    # 'b' was least recently used when 'c' pushed the cache past its limit
+    assert evicted == [False, True, False]
+    assert all(pool.closed for pool in created)
+
+
+def test_idle_pools_evicted():
+    executor = ModuleExecutor()
+    created = []
+
+    async def create_pool():
+        created.append(FakePool())
+        return created[-1]
+
+    async def run():
+        await executor._get_pool('postgresql', {'host': 'a'}, create_pool)
+        for key in executor._pool_last_used:
+            executor._pool_last_used[key] -= executor_module.POOL_IDLE_TIMEOUT_SECONDS + 1
+        await executor._get_pool('postgresql', {'host': 'b'}, create_pool)
+        await asyncio.gather(*executor._closing_pools)
+        return list(executor._db_connections.values())
+
+    remaining = asyncio.run(run())
+
+    assert created[0].closed
+    assert remaining == [created[1]]
@@ -13,7 +13,7 @@ export function useSocket() {
   const [isConnected, setIsConnected] = useState(false);
   const hasShownConnectionMessage = useRef(false);
   const reconnectAttempts = useRef(0);
-  const { addMessage, setTyping } = useChatStore();
+  const { addMessage, appendStreamDelta, completeStream, setTyping } = useChatStore();
   const { user, refreshAccessToken, logout } = useAuthStore();
 
   // Function to handle reconnection with fresh token
@@ -79,6 +79,14 @@ export function useSocket() {
             actions: data.actions,
           });
         },
+        onChatResponseChunk: (data: { delta: string }) => {
+          setTyping(false);
+          appendStreamDelta(data.delta);
+        },
+        onChatResponseDone: (data: { message: string; actions?: ChatAction[] }) => {
+          setTyping(false);
+          completeStream(data.message, data.actions);
+        },
         onError: (error: string) => {
           setTyping(false);
 
@@ -106,7 +114,7 @@ export function useSocket() {
         reconnectWithFreshToken();
       }
     }
-  }, [user, addMessage, setTyping, reconnectWithFreshToken]);
+  }, [user, addMessage, appendStreamDelta, completeStream, setTyping, reconnectWithFreshToken]);
 
   const sendMessage = useCallback(
     async (content: string) => {
@@ -11,6 +11,8 @@ export interface SocketCallbacks {
   onConnect?: () => void;
   onDisconnect?: () => void;
   onChatResponse?: (data: { message: string; actions?: ChatAction[] }) => void;
+  onChatResponseChunk?: (data: { delta: string }) => void;
+  onChatResponseDone?: (data: { message: string; actions?: ChatAction[] }) => void;
   onError?: (error: string) => void;
 }
 
@@ -68,6 +70,16 @@ export const initializeSocket = (callbacks: SocketCallbacks): Socket => {
     callbacks.onChatResponse?.(data);
   });
 
+  // Streamed agent responses: deltas as they are generated, then the final message
+  socket.on('chat_response_chunk', (data: { delta: string }) => {
+    callbacks.onChatResponseChunk?.(data);
+  });
+
+  socket.on('chat_response_done', (data: { message: string; actions?: ChatAction[] }) => {
+    console.log('Chat response stream completed:', data);
+    callbacks.onChatResponseDone?.(data);
+  });
+
   socket.on('error', (error: string) => {
     console.error('Socket error:', error);
     callbacks.onError?.(error);
@@ -84,7 +96,7 @@ export const sendChatMessage = (message: string): void => {
 
   // user_id is now retrieved from the Socket.IO session on the backend
   // No need to send it from the client anymore
-  socket.emit('chat_message', { message });
+  socket.emit('chat_message', { message, stream: true });
 };
 
 export const disconnectSocket = (): void => {
@@ -7,7 +7,10 @@ interface ChatState {
   messages: ChatMessage[];
   isTyping: boolean;
   connectedProviders: string[];
+  streamingMessageId: string | null;
   addMessage: (message: Omit<ChatMessage, 'id' | 'timestamp'>) => void;
+  appendStreamDelta: (delta: string) => void;
+  completeStream: (content: string, actions?: ChatAction[]) => void;
   setTyping: (typing: boolean) => void;
   addConnectedProvider: (provider: string) => void;
   clearMessages: () => void;
@@ -36,9 +39,11 @@ What would you like to do? You can say things like:
   ],
   isTyping: false,
   connectedProviders: [],
+  streamingMessageId: null,
 
   addMessage: (message) =>
     set((state) => ({
+      streamingMessageId: null,
       messages: [
         ...state.messages,
         {
@@ -49,6 +54,44 @@ What would you like to do? You can say things like:
       ],
     })),
 
+  appendStreamDelta: (delta) =>
+    set((state) => {
+      if (state.streamingMessageId === null) {
+        const id = `msg-${++messageId}`;
+        return {
+          streamingMessageId: id,
+          messages: [
+            ...state.messages,
+            { id, role: 'assistant', content: delta, timestamp: new Date() },
+          ],
+        };
+      }
+      return {
+        messages: state.messages.map((msg) =>
+          msg.id === state.streamingMessageId ? { ...msg, content: msg.content + delta } : msg
+        ),
+      };
+    }),
+
+  completeStream: (content, actions) =>
+    set((state) => {
+      if (state.streamingMessageId === null) {
+        return {
+          messages: [
+            ...state.messages,
+            { id: `msg-${++messageId}`, role: 'assistant', content, actions, timestamp: new Date() },
+          ],
+        };
+      }
+      // Replace streamed text with the final message (drops pre-tool-call chatter)
+      return {
+        streamingMessageId: null,
+        messages: state.messages.map((msg) =>
+          msg.id === state.streamingMessageId ? { ...msg, content, actions } : msg
+        ),
+      };
+    }),
+
   setTyping: (isTyping) => set({ isTyping }),
 
   addConnectedProvider: (provider) =>
@@ -60,6 +103,7 @@ What would you like to do? You can say things like:
 
   clearMessages: () =>
     set({
+      streamingMessageId: null,
       messages: [
         {
           id: 'welcome',